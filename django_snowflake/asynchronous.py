@@ -0,0 +1,187 @@
+import asyncio
+import time
+from contextlib import nullcontext
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import EmptyResultSet
+from django.db import OperationalError, connections
+from django.db.models.query import MAX_GET_RESULTS
+
+
+class AsyncQuery:
+    """
+    A QuerySet that was submitted to Snowflake with submit() and is executing
+    in the warehouse while the caller does other work.
+    """
+
+    def __init__(self, queryset, query_id):
+        self.queryset = queryset
+        # None if the QuerySet can't return any rows.
+        self.query_id = query_id
+
+    def __repr__(self):
+        return '<%s: %s>' % (self.__class__.__name__, self.query_id)
+
+    @property
+    def connection(self):
+        return connections[self.queryset.db]
+
+    def is_running(self):
+        """Return True if the query hasn't finished. Raise an error if it failed."""
+        return self.query_id is not None and self.connection.is_async_running(self.query_id)
+
+    def wait(self, timeout=None):
+        """Wait (up to timeout seconds) for the query to finish."""
+        if self.query_id is not None:
+            self.connection.wait_async(self.query_id, timeout)
+
+    def result(self, timeout=None):
+        """
+        Wait for the query to finish and return its results as a list of
+        what the QuerySet would return (model instances, dictionaries, etc.).
+        """
+        if self.query_id is None:
+            return []
+        self.wait(timeout)
+        return self._fetch()
+
+    async def ais_running(self):
+        return await sync_to_async(self.is_running)()
+
+    async def aresult(self, timeout=None):
+        """
+        Like result(), but await the query rather than blocking a thread
+        while it runs.
+        """
+        if self.query_id is None:
+            return []
+        await await_query(self.queryset.db, self.query_id, timeout)
+        return await sync_to_async(self._fetch)()
+
+    def _fetch(self):
+        queryset = self.queryset._chain()
+        # Fetch the finished query's result rather than executing it again
+        # (see SQLCompiler.as_sql()).
+        queryset.query.async_query_id = self.query_id
+        return list(queryset)
+
+
+def _submit_async(queryset, sql, params):
+    connection = connections[queryset.db]
+    # The warehouse from WarehouseQuerySet.using_warehouse().
+    warehouse = getattr(queryset.query, 'warehouse', None)
+    with connection.use_warehouse(warehouse) if warehouse else nullcontext():
+        return connection.submit_async(sql, params)
+
+
+def submit(queryset):
+    """
+    Start executing queryset in Snowflake and return an AsyncQuery without
+    waiting for the results, for example, to run several slow queries
+    concurrently:
+
+        queries = [submit(qs) for qs in querysets]
+        results = [query.result() for query in queries]
+    """
+    connection = connections[queryset.db]
+    try:
+        sql, params = queryset.query.get_compiler(connection=connection).as_sql()
+    except EmptyResultSet:
+        return AsyncQuery(queryset, None)
+    return AsyncQuery(queryset, _submit_async(queryset, sql, params))
+
+
+async def asubmit(queryset):
+    return await sync_to_async(submit)(queryset)
+
+
+async def await_query(using, query_id, timeout=None):
+    """
+    Like DatabaseWrapper.wait_async(), but sleep with asyncio between polls
+    so that no thread is occupied while the query runs.
+    """
+    # Database connections must only be used in synchronous code.
+    def is_running():
+        return connections[using].is_async_running(query_id)
+
+    connection = connections[using]
+    deadline = None if timeout is None else time.monotonic() + timeout
+    interval = connection.min_async_poll_interval
+    while await sync_to_async(is_running)():
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise OperationalError("Query %s didn't finish within %s seconds." % (query_id, timeout))
+            await asyncio.sleep(min(interval, remaining))
+        else:
+            await asyncio.sleep(interval)
+        interval = min(interval * 2, connection.max_async_poll_interval)
+
+
+async def alist(queryset):
+    """Return a list of queryset's results."""
+    return await (await asubmit(queryset)).aresult()
+
+
+class _CapturedQuery(Exception):
+    """Raised by _capture_query() instead of executing a query."""
+
+    def __init__(self, sql, params):
+        super().__init__(sql, params)
+        self.sql = sql
+        self.params = params
+
+
+def _capture_query(execute, sql, params, many, context):
+    raise _CapturedQuery(sql, params)
+
+
+def _submit_count(queryset):
+    """
+    Submit the query that QuerySet.count() would execute. Return (query_id,
+    None), or (None, count) if the count is known without executing a query
+    (e.g. if the QuerySet can't return any rows).
+    """
+    if queryset._result_cache is not None:
+        return None, len(queryset._result_cache)
+    connection = connections[queryset.db]
+    # Query.get_count() compiles the query the way Django counts rows (e.g.
+    # without ordering, select_related() joins, or unneeded columns) and
+    # executes it, so capture the query rather than executing it.
+    try:
+        with connection.execute_wrapper(_capture_query):
+            return None, queryset.query.get_count(using=queryset.db)
+    except _CapturedQuery as captured:
+        return _submit_async(queryset, captured.sql, captured.params), None
+
+
+def _fetch_count(queryset, query_id):
+    return connections[queryset.db].fetch_async(query_id)[0][0]
+
+
+async def acount(queryset):
+    """Return the number of objects in queryset, like QuerySet.count()."""
+    query_id, count = await sync_to_async(_submit_count)(queryset)
+    if query_id is None:
+        return count
+    await await_query(queryset.db, query_id)
+    return await sync_to_async(_fetch_count)(queryset, query_id)
+
+
+async def aget(queryset, *args, **kwargs):
+    """Return the object matching the given lookups, like QuerySet.get()."""
+    clone = queryset.filter(*args, **kwargs) if args or kwargs else queryset._chain()
+    if clone.query.can_filter() and not clone.query.distinct_fields:
+        clone = clone.order_by()
+    clone.query.set_limits(high=MAX_GET_RESULTS)
+    results = await alist(clone)
+    num = len(results)
+    if num == 1:
+        return results[0]
+    model = queryset.model
+    if not num:
+        raise model.DoesNotExist('%s matching query does not exist.' % model._meta.object_name)
+    raise model.MultipleObjectsReturned('get() returned more than one %s -- it returned %s!' % (
+        model._meta.object_name,
+        num if num < MAX_GET_RESULTS else 'more than %s' % (MAX_GET_RESULTS - 1),
+    ))
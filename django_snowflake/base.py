@@ -1,8 +1,15 @@
+import json
 import os
+import re
+import time
+from contextlib import contextmanager, nullcontext
+from itertools import batched
 
 from django.core.exceptions import ImproperlyConfigured
-from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db import DatabaseError, NotSupportedError
+from django.db.backends.base.base import NO_DB_ALIAS, BaseDatabaseWrapper
 from django.utils.asyncio import async_unsafe
+from django.utils.regex_helper import _lazy_re_compile
 
 try:
     import snowflake.connector as Database
@@ -12,12 +19,23 @@ except ImportError as e:
 # Some of these import snowflake connector, so import them after checking if it's installed.
 from . import __version__                                   # NOQA isort:skip
 from .client import DatabaseClient                          # NOQA isort:skip
+from .cache import get_result_cache                         # NOQA isort:skip
 from .creation import DatabaseCreation                      # NOQA isort:skip
+from .cursor import CursorDebugWrapper                      # NOQA isort:skip
+from .cursor import ServerSideBindingCursor                 # NOQA isort:skip
+from .cursor import StreamingCursor                         # NOQA isort:skip
 from .features import DatabaseFeatures                      # NOQA isort:skip
 from .introspection import DatabaseIntrospection            # NOQA isort:skip
 from .operations import DatabaseOperations                  # NOQA isort:skip
+from .pool import ConnectionPool                            # NOQA isort:skip
 from .schema import DatabaseSchemaEditor                    # NOQA isort:skip
 
+# Statements that don't change data, so that emulated savepoints needn't
+# replay them.
+read_statement_re = _lazy_re_compile(r'\s*(?:SELECT|SHOW|DESC|DESCRIBE|EXPLAIN|WITH)\b', re.IGNORECASE)
+# Statements that implicitly commit the transaction.
+ddl_statement_re = _lazy_re_compile(r'\s*(?:CREATE|ALTER|DROP|UNDROP|GRANT|REVOKE|COMMENT)\b', re.IGNORECASE)
+
 
 class DatabaseWrapper(BaseDatabaseWrapper):
     vendor = 'snowflake'
@@ -92,6 +110,113 @@ class DatabaseWrapper(BaseDatabaseWrapper):
 
     password_not_required_options = ('private_key', 'private_key_file', 'authenticator', 'token')
     settings_is_missing = "settings.DATABASES is missing '%s' for 'django_snowflake'."
+    # Snowflake backend-specific attributes.
+    _connection_pools = {}
+    _result_caches = {}
+    # The range of intervals, in seconds, at which wait_async() polls the
+    # status of a query.
+    min_async_poll_interval = 0.05
+    max_async_poll_interval = 1
+    # The maximum number of statements that execute_batch() sends in a
+    # request.
+    max_batch_statements = 100
+    _session_state = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.settings_dict['OPTIONS'].get('pk_sequences'):
+            # AutoFields default to the next value of a sequence (see
+            # DatabaseSchemaEditor.column_sql()) rather than AUTOINCREMENT.
+            self.data_types_suffix = {}
+        # The statements that changed data in the current transaction and,
+        # for each savepoint, the number of them executed before it.
+        self._savepoint_journal = []
+        self._savepoint_positions = {}
+        # The position in the journal of the first statement that replaying
+        # wouldn't reproduce and the error to raise when rolling back to a
+        # savepoint created after it (see journal_unreplayable()).
+        self._savepoint_unreplayable = None
+        # The warehouses and tags of the active use_warehouse() and
+        # query_tag() blocks.
+        self._warehouses = []
+        self._query_tags = []
+        if self.settings_dict['OPTIONS'].get('emulate_savepoints'):
+            self.execute_wrappers.append(self._journal_statement)
+
+    @property
+    def pool(self):
+        pool_options = self.settings_dict['OPTIONS'].get('pool')
+        if self.alias == NO_DB_ALIAS or not pool_options:
+            return None
+
+        if self.alias not in self._connection_pools:
+            if self.settings_dict.get('CONN_MAX_AGE', 0) != 0:
+                raise ImproperlyConfigured("Pooling doesn't support persistent connections.")
+            # Set the default options.
+            if pool_options is True:
+                pool_options = {}
+            pool = ConnectionPool(
+                Database.connect,
+                check=self._check_pooled_connection if self.settings_dict['CONN_HEALTH_CHECKS'] else None,
+                **pool_options,
+            )
+            # setdefault() ensures that if multiple threads create a pool at
+            # the same time, they all use the first one that's set.
+            self._connection_pools.setdefault(self.alias, pool)
+
+        return self._connection_pools[self.alias]
+
+    def close_pool(self):
+        if self.pool:
+            self.pool.close()
+            del self._connection_pools[self.alias]
+
+    @staticmethod
+    def _check_pooled_connection(connection):
+        return connection.is_valid()
+
+    @property
+    def result_cache(self):
+        """
+        The process-wide ResultCache configured by OPTIONS['result_cache'], or
+        None if results aren't cached.
+        """
+        options = self.settings_dict['OPTIONS'].get('result_cache')
+        if not options:
+            return None
+        if self.alias not in self._result_caches:
+            self._result_caches[self.alias] = get_result_cache(options)
+        return self._result_caches[self.alias]
+
+    def invalidate_result_cache(self, tables):
+        """
+        Invalidate the cached results of queries that read any of the given
+        tables (quoted names), e.g. after writing to them.
+        """
+        if (result_cache := self.result_cache) is None:
+            return
+        result_cache.invalidate(tables)
+        if self.in_atomic_block:
+            # Other connections may cache results before the write is
+            # committed.
+            self.on_commit(lambda: result_cache.invalidate(tables))
+
+    def clear_result_cache(self):
+        if (result_cache := self.result_cache) is not None:
+            result_cache.clear()
+
+    @property
+    def session_state(self):
+        """
+        A dictionary of the session settings applied to the current
+        connection. Pooled connections keep it when they're reused so that
+        they needn't be initialized again.
+        """
+        if self.pool:
+            return self.pool.session_state(self.connection)
+        if self._session_state is None:
+            self._session_state = {}
+        return self._session_state
 
     def get_login_token(self):
         """
@@ -117,6 +242,42 @@ class DatabaseWrapper(BaseDatabaseWrapper):
             'interpolate_empty_sequences':  True,
             **settings_dict['OPTIONS'],
         }
+        # Remove options that are handled by this backend rather than by
+        # snowflake.connector.connect().
+        conn_params.pop('bulk_copy_threshold', None)
+        conn_params.pop('emulate_savepoints', None)
+        conn_params.pop('pk_sequences', None)
+        conn_params.pop('pool', None)
+        conn_params.pop('result_cache', None)
+        conn_params.pop('schema_introspection', None)
+        conn_params.pop('stream_results', None)
+        if conn_params.pop('server_side_binding', False):
+            # Django's %s placeholders are converted by
+            # ServerSideBindingCursor.
+            conn_params['paramstyle'] = 'qmark'
+        if conn_params.pop('arrow_fetch', False):
+            try:
+                import pyarrow  # NOQA
+            except ImportError as e:
+                raise ImproperlyConfigured(
+                    "OPTIONS['arrow_fetch'] requires pyarrow. Did you install "
+                    "snowflake-connector-python[pandas]? (%s)" % e
+                )
+            # Otherwise, Arrow tables have float64 rather than decimal
+            # columns for NUMBERs with a scale (e.g. DecimalField), unlike the
+            # rows from fetchmany().
+            conn_params['arrow_number_to_decimal'] = True
+        # Initialize the session when logging in rather than with separate
+        # queries after connecting. OPTIONS['session_parameters'] (e.g.
+        # QUERY_TAG or STATEMENT_TIMEOUT_IN_SECONDS) takes precedence.
+        conn_params['session_parameters'] = {
+            # AUTOINCREMENT IDs must be monotonically increasing in order for
+            # DatabaseOperations.last_insert_id() to fetch the correct ID.
+            'NOORDER_SEQUENCE_AS_DEFAULT': False,
+            **({'TIMEZONE': self.timezone_name} if self.timezone_name else {}),
+            **conn_params.get('session_parameters', {}),
+        }
+        conn_params.setdefault('autocommit', settings_dict['AUTOCOMMIT'])
         if os.environ.get('RUNNING_DJANGOS_TEST_SUITE') != 'true':
             conn_params.setdefault('application', 'Django_SnowflakeConnector_%s' % __version__)
 
@@ -166,7 +327,21 @@ class DatabaseWrapper(BaseDatabaseWrapper):
 
     @async_unsafe
     def get_new_connection(self, conn_params):
-        return Database.connect(**conn_params)
+        if self.pool:
+            connection = self.pool.getconn(conn_params)
+            session_state = self.pool.session_state(connection)
+        else:
+            connection = Database.connect(**conn_params)
+            session_state = self._session_state = {}
+        if not session_state:
+            # A new connection is initialized by its session parameters.
+            session_state.update(
+                autocommit=conn_params['autocommit'],
+                timezone_name=conn_params['session_parameters'].get('TIMEZONE'),
+                warehouse=conn_params['warehouse'],
+                query_tag=conn_params['session_parameters'].get('QUERY_TAG', ''),
+            )
+        return connection
 
     def ensure_timezone(self):
         if self.connection is None:
@@ -175,30 +350,234 @@ class DatabaseWrapper(BaseDatabaseWrapper):
             conn_timezone_name = cursor.execute("SHOW PARAMETERS LIKE 'TIMEZONE'").fetchone()[1]
         timezone_name = self.timezone_name
         if timezone_name and conn_timezone_name != timezone_name:
-            with self.connection.cursor() as cursor:
-                cursor.execute("ALTER SESSION SET TIMEZONE=%s", [timezone_name])
+            with self._raw_cursor() as cursor:
+                # ALTER SESSION doesn't accept bind variables.
+                cursor.execute('ALTER SESSION SET TIMEZONE = %s' % self.ops.quote_string(timezone_name))
+            self.session_state['timezone_name'] = timezone_name
             return True
         return False
 
     def init_connection_state(self):
-        # AUTOINCREMENT IDs must be monotonically increasing in order for
-        # DatabaseOperations.last_insert_id() to fetch the correct ID.
-        with self.connection.cursor() as cursor:
-            cursor.execute("ALTER SESSION SET NOORDER_SEQUENCE_AS_DEFAULT=False")
+        if self.session_state.get('timezone_name') == self.timezone_name:
+            # The time zone was set by the session parameters when connecting
+            # (or, for a pooled connection, when it was last used).
+            return
         timezone_changed = self.ensure_timezone()
+        self.session_state['timezone_name'] = self.timezone_name
         if timezone_changed:
             # Commit after setting the time zone (see #17062)
             # (This is copied from the postgresql backend.)
             if not self.get_autocommit():
                 self.connection.commit()
 
+    @contextmanager
+    def use_warehouse(self, warehouse):
+        """
+        Execute the queries in the block with the given warehouse rather than
+        settings.DATABASES[...]['WAREHOUSE'].
+        """
+        self._warehouses.append(self.ops.quote_name(warehouse))
+        try:
+            yield
+        finally:
+            self._warehouses.pop()
+
+    def _ensure_warehouse(self):
+        """
+        Switch the session to the warehouse that queries should use (see
+        use_warehouse()) if it isn't already current.
+        """
+        warehouse = self._warehouses[-1] if self._warehouses else self.ops.quote_name(self.settings_dict['WAREHOUSE'])
+        if self.session_state.get('warehouse') != warehouse:
+            with self.connection.cursor() as cursor:
+                cursor.execute(f'USE WAREHOUSE {warehouse}')
+            self.session_state['warehouse'] = warehouse
+
+    @contextmanager
+    def query_tag(self, tag):
+        """
+        Set the QUERY_TAG of the queries executed in the block, e.g. to find
+        them in Snowflake's QUERY_HISTORY. tag may be a string or a dictionary,
+        which is stored as JSON and merged with the dictionary of an enclosing
+        block.
+        """
+        if isinstance(tag, dict) and self._query_tags and isinstance(self._query_tags[-1], dict):
+            tag = {**self._query_tags[-1], **tag}
+        self._query_tags.append(tag)
+        try:
+            yield
+        finally:
+            self._query_tags.pop()
+
+    def reset_query_tag(self):
+        """
+        Restore the session's QUERY_TAG to the tag of the enclosing query_tag()
+        block (or the default) if a query changed it, e.g. before the
+        connection is reused by other code.
+        """
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self._ensure_query_tag()
+
+    def _ensure_query_tag(self):
+        """Set the session's QUERY_TAG (see query_tag()) if it changed."""
+        if self._query_tags:
+            tag = self._query_tags[-1]
+            if isinstance(tag, dict):
+                tag = json.dumps(tag, sort_keys=True, default=str)
+        else:
+            tag = self.settings_dict['OPTIONS'].get('session_parameters', {}).get('QUERY_TAG', '')
+        if self.session_state.get('query_tag') != tag:
+            with self._raw_cursor() as cursor:
+                cursor.execute('ALTER SESSION SET QUERY_TAG = %s' % self.ops.quote_string(tag))
+            self.session_state['query_tag'] = tag
+
+    def make_debug_cursor(self, cursor):
+        return CursorDebugWrapper(cursor, self)
+
+    def _raw_cursor(self):
+        """
+        Return a snowflake.connector cursor that accepts Django's %s
+        placeholders.
+        """
+        cursor = self.connection.cursor()
+        if self.settings_dict['OPTIONS'].get('server_side_binding'):
+            return ServerSideBindingCursor(cursor)
+        return cursor
+
     @async_unsafe
     def create_cursor(self, name=None):
-        return self.connection.cursor()
+        self._ensure_warehouse()
+        self._ensure_query_tag()
+        cursor = self._raw_cursor()
+        if name is None:
+            return cursor
+        # A cursor from chunked_cursor().
+        options = self.settings_dict['OPTIONS']['stream_results']
+        if options is True:
+            options = {}
+        return StreamingCursor(cursor, **options)
+
+    def chunked_cursor(self):
+        """
+        With OPTIONS['stream_results'], return a cursor that downloads the
+        result of QuerySet.iterator() one batch at a time.
+        """
+        if self.settings_dict['OPTIONS'].get('stream_results'):
+            return self._cursor(name='stream')
+        return super().chunked_cursor()
 
     def _set_autocommit(self, autocommit):
+        session_state = self.session_state
+        if session_state.get('autocommit') == autocommit:
+            return
         with self.wrap_database_errors:
             self.connection.autocommit(autocommit)
+        session_state['autocommit'] = autocommit
+
+    def _journal_statement(self, execute, sql, params, many, context):
+        """
+        An execute wrapper that records the statements executed in a
+        transaction for emulated savepoints (OPTIONS['emulate_savepoints']).
+        """
+        if many:
+            # Keep the parameters even if they're an iterator.
+            params = list(params)
+        result = execute(sql, params, many, context)
+        self._record_statement(sql, params, many)
+        return result
+
+    def _record_statement(self, sql, params, many):
+        if self.autocommit or read_statement_re.match(sql):
+            pass
+        elif ddl_statement_re.match(sql):
+            # The statements before this one were committed, so savepoints
+            # created before it can't be rolled back to.
+            self._savepoint_journal = []
+            self._savepoint_positions = dict.fromkeys(self._savepoint_positions)
+            self._savepoint_unreplayable = None
+        else:
+            self._savepoint_journal.append((sql, params, many))
+
+    def _clear_savepoint_journal(self):
+        self._savepoint_journal = []
+        self._savepoint_positions = {}
+        self._savepoint_unreplayable = None
+
+    @contextmanager
+    def journal_unreplayable(self, message):
+        """
+        Mark the statements executed in the block as ones that replaying
+        wouldn't reproduce (e.g. inserts that generate AUTOINCREMENT primary
+        keys that are already assigned to model instances and used by later
+        statements), so that rolling back to a savepoint created after them
+        raises NotSupportedError(message).
+        """
+        position = len(self._savepoint_journal)
+        try:
+            yield
+        finally:
+            if len(self._savepoint_journal) > position and self._savepoint_unreplayable is None:
+                self._savepoint_unreplayable = (position, message)
+
+    def _commit(self):
+        self._clear_savepoint_journal()
+        return super()._commit()
+
+    def _rollback(self):
+        self._clear_savepoint_journal()
+        return super()._rollback()
+
+    def _savepoint(self, sid):
+        # Snowflake doesn't support savepoints. They're emulated (if
+        # OPTIONS['emulate_savepoints'] is set) by rolling back the
+        # transaction and replaying the statements executed before the
+        # savepoint.
+        self._savepoint_positions[sid] = len(self._savepoint_journal)
+
+    def _savepoint_rollback(self, sid):
+        if (position := self._savepoint_positions[sid]) is None:
+            raise NotSupportedError(
+                "Can't roll back to a savepoint created before a DDL statement committed the transaction."
+            )
+        if self._savepoint_unreplayable is not None and self._savepoint_unreplayable[0] < position:
+            raise NotSupportedError(self._savepoint_unreplayable[1])
+        journal = self._savepoint_journal[:position]
+        positions = {
+            savepoint: position for savepoint, position in self._savepoint_positions.items()
+            if position is not None and position <= len(journal)
+        }
+        self._rollback()
+        # Replaying the statements journals them again.
+        with self.cursor() as cursor:
+            for sql, params, many in journal:
+                if many:
+                    cursor.executemany(sql, params)
+                else:
+                    cursor.execute(sql, params)
+        self._savepoint_positions = positions
+
+    def _savepoint_commit(self, sid):
+        self._savepoint_positions.pop(sid, None)
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                if self.pool:
+                    # Don't return a connection with an open transaction.
+                    if not self.autocommit:
+                        self.connection.rollback()
+                    self.pool.putconn(self.connection)
+                    # The connection can no longer be used.
+                    self.connection = None
+                else:
+                    return self.connection.close()
+
+    def close_if_health_check_failed(self):
+        if self.pool:
+            # The pool only returns healthy connections.
+            return
+        return super().close_if_health_check_failed()
 
     def is_usable(self):
         try:
@@ -209,3 +588,117 @@ class DatabaseWrapper(BaseDatabaseWrapper):
             return False
         else:
             return True
+
+    def submit_async(self, sql, params=None):
+        """
+        Start executing sql without waiting for it to finish and return its
+        query ID, e.g. for wait_async() and fetch_async().
+        """
+        self.ensure_connection()
+        with self.wrap_database_errors:
+            self._ensure_warehouse()
+            self._ensure_query_tag()
+            with self._raw_cursor() as cursor:
+                cursor.execute_async(sql, params)
+                return cursor.sfqid
+
+    def is_async_running(self, query_id):
+        """
+        Return True if the query with the given ID is still running (or
+        queued). Raise an error if the query failed.
+        """
+        self.ensure_connection()
+        with self.wrap_database_errors:
+            status = self.connection.get_query_status_throw_if_error(query_id)
+            return self.connection.is_still_running(status)
+
+    def wait_async(self, query_id, timeout=None):
+        """
+        Wait for the query with the given ID to finish, polling its status
+        with an increasing interval (up to max_async_poll_interval seconds).
+        Raise OperationalError if it's still running after timeout seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        interval = self.min_async_poll_interval
+        while self.is_async_running(query_id):
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    with self.wrap_database_errors:
+                        raise Database.OperationalError(
+                            msg="Query %s didn't finish within %s seconds." % (query_id, timeout)
+                        )
+                time.sleep(min(interval, remaining))
+            else:
+                time.sleep(interval)
+            interval = min(interval * 2, self.max_async_poll_interval)
+
+    def fetch_async(self, query_id, timeout=None):
+        """Wait for the query with the given ID to finish and return its rows."""
+        self.wait_async(query_id, timeout)
+        with self.wrap_database_errors:
+            with self.connection.cursor() as cursor:
+                cursor.get_results_from_sfqid(query_id)
+                return cursor.fetchall()
+
+    def execute_batch(self, sql_list):
+        """
+        Execute statements without parameters, sending up to
+        max_batch_statements of them in each multi-statement request rather
+        than making a round trip for each one.
+        """
+        sql_list = [str(sql).strip().removesuffix(';') for sql in sql_list]
+        with self.cursor() as cursor:
+            for batch in batched(sql_list, self.max_batch_statements):
+                if len(batch) == 1:
+                    cursor.execute(batch[0])
+                    continue
+                sql = ';\n'.join(batch)
+                debug_sql = cursor.debug_sql(sql) if isinstance(cursor, CursorDebugWrapper) else nullcontext()
+                try:
+                    with debug_sql, self.wrap_database_errors:
+                        cursor.cursor.execute(sql, num_statements=len(batch))
+                    if self._journal_statement in self.execute_wrappers:
+                        for statement in batch:
+                            self._record_statement(statement, None, False)
+                except DatabaseError as e:
+                    if (index := self._failed_batch_statement(cursor.cursor, len(batch))) is not None:
+                        e.add_note('The error occurred in statement %d of %d in a batch:\n%s' % (
+                            index + 1, len(batch), batch[index],
+                        ))
+                    else:
+                        e.add_note('The error occurred in a batch of these statements:\n%s' % '\n'.join(
+                            '%d: %s' % (number, statement) for number, statement in enumerate(batch, 1)
+                        ))
+                    raise
+
+    def _failed_batch_statement(self, cursor, count):
+        """
+        Return the index of the statement that failed in the multi-statement
+        request that cursor just executed, or None if it can't be found.
+
+        The statements are executed in order as child queries of the request
+        in the same session, so the index is the number of them that
+        succeeded.
+        """
+        if (query_id := getattr(cursor, 'sfqid', None)) is None:
+            return None
+        try:
+            cursor.execute(
+                'SELECT QUERY_ID, EXECUTION_STATUS FROM '
+                'TABLE(INFORMATION_SCHEMA.QUERY_HISTORY_BY_SESSION(RESULT_LIMIT => %s)) '
+                'ORDER BY START_TIME',
+                (self.max_batch_statements * 10,),
+            )
+            rows = cursor.fetchall()
+        except Exception:
+            # Don't hide the original error.
+            return None
+        query_ids = [query_id for query_id, _ in rows]
+        if query_id not in query_ids:
+            return None
+        children = rows[query_ids.index(query_id) + 1:][:count]
+        for index, (_, status) in enumerate(children):
+            if status != 'SUCCESS':
+                return index
+        return None
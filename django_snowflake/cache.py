@@ -0,0 +1,186 @@
+import hashlib
+import pickle
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.regex_helper import _lazy_re_compile
+
+# Tables are referenced as FROM "TABLE" or JOIN "TABLE" in compiled queries.
+table_re = _lazy_re_compile(r'\b(?:FROM|JOIN)\s+("[^"]+"(?:\."[^"]+")*)')
+# Functions whose results change between executions of a query.
+volatile_re = _lazy_re_compile(
+    r'\b(?:CURRENT_\w+|LOCALTIME\w*|SYSDATE|GETDATE|RANDOM|UNIFORM|UUID_STRING|NEXTVAL|RESULT_SCAN)\b',
+    re.IGNORECASE,
+)
+
+
+def get_tables(sql):
+    """
+    Return the quoted names of the tables that a compiled query reads, or
+    None if its result can't be cached.
+    """
+    if volatile_re.search(sql):
+        return None
+    return sorted(set(table_re.findall(sql))) or None
+
+
+class ResultCache:
+    """
+    Base class for the stores of query results cached with
+    DATABASES[...]['OPTIONS']['result_cache'].
+
+    Each table has a version that's changed when the table is written to.
+    Cached results are keyed by their query and the versions of the tables
+    it reads, so writes make the results of queries that read the table
+    unreachable.
+    """
+
+    def __init__(self, check_last_altered=False):
+        # Whether to compare the LAST_ALTERED time of the tables a query
+        # reads with their time when the result was cached, in order to
+        # detect changes made by other clients.
+        self.check_last_altered = check_last_altered
+
+    def make_key(self, connection, sql, params, tables):
+        settings_dict = connection.settings_dict
+        versions = self.get_versions(tables)
+        key = (
+            settings_dict['ACCOUNT'], settings_dict['NAME'], settings_dict['SCHEMA'],
+            settings_dict['OPTIONS'].get('role'), sql, params,
+            [versions.get(table) for table in tables],
+        )
+        return 'django_snowflake:result:%s' % hashlib.sha256(pickle.dumps(key)).hexdigest()
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value):
+        raise NotImplementedError
+
+    def get_versions(self, tables):
+        """Return a dictionary of {table: version} for the given tables."""
+        raise NotImplementedError
+
+    def invalidate(self, tables):
+        """Change the versions of the given tables."""
+        raise NotImplementedError
+
+    def clear(self):
+        """Invalidate all cached results."""
+        raise NotImplementedError
+
+
+class LocalResultCache(ResultCache):
+    """
+    A least-recently-used cache in the memory of the current process.
+
+    Table versions are only changed by writes made in this process, so
+    results expire after timeout seconds to limit how long writes by other
+    processes go undetected.
+    """
+
+    def __init__(self, max_entries=1000, timeout=300, **kwargs):
+        super().__init__(**kwargs)
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._results = OrderedDict()
+        self._versions = {}
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._results:
+                return None
+            expires, value = self._results[key]
+            if expires is not None and expires <= time.monotonic():
+                del self._results[key]
+                return None
+            self._results.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires = None if self.timeout is None else time.monotonic() + self.timeout
+        with self._lock:
+            self._results[key] = (expires, value)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def get_versions(self, tables):
+        with self._lock:
+            return {table: self._versions.get(table, 0) for table in tables}
+
+    def invalidate(self, tables):
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+            self._versions.clear()
+
+
+class DjangoResultCache(ResultCache):
+    """
+    A cache that uses one of Django's CACHES (e.g. a shared Redis or
+    Memcached cache), so that results and invalidations are shared between
+    processes.
+    """
+
+    def __init__(self, cache='default', timeout=300, **kwargs):
+        super().__init__(**kwargs)
+        self.cache_alias = cache
+        self.timeout = timeout
+        # Changed by clear() to invalidate all tables.
+        self._generation_key = 'django_snowflake:generation'
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def _version_key(self, table):
+        return 'django_snowflake:table:%s' % table
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value):
+        self.cache.set(key, value, self.timeout)
+
+    def get_versions(self, tables):
+        keys = [self._generation_key, *(self._version_key(table) for table in tables)]
+        versions = self.cache.get_many(keys)
+        if missing := [key for key in keys if key not in versions]:
+            # Initialize missing (e.g. evicted) versions rather than using
+            # None so that results cached before an eviction can't be reused.
+            for key in missing:
+                self.cache.add(key, uuid.uuid4().hex, None)
+            versions.update(self.cache.get_many(missing))
+        generation = versions.get(self._generation_key)
+        return {table: (generation, versions.get(self._version_key(table))) for table in tables}
+
+    def invalidate(self, tables):
+        # Versions don't expire so that results can't outlive them.
+        self.cache.set_many({self._version_key(table): uuid.uuid4().hex for table in tables}, None)
+
+    def clear(self):
+        self.cache.set(self._generation_key, uuid.uuid4().hex, None)
+
+
+def get_result_cache(options):
+    """Return a ResultCache configured by OPTIONS['result_cache']."""
+    if options is True:
+        options = {}
+    options = options.copy()
+    backend = options.pop('backend', 'local')
+    if backend == 'local':
+        return LocalResultCache(**options)
+    if backend == 'django':
+        return DjangoResultCache(**options)
+    raise ImproperlyConfigured("OPTIONS['result_cache']['backend'] must be 'local' or 'django'.")
@@ -1,13 +1,243 @@
+import csv
+import gzip
+import os
+import tempfile
+import uuid
+from contextlib import nullcontext
 from functools import partial
 from itertools import chain
 
-from django.db.models import JSONField
+from django.core.exceptions import EmptyResultSet, FullResultSet
+from django.db.models import AutoField, JSONField
+from django.db.models.constants import OnConflict
+from django.db.models.expressions import Case, Col, DatabaseDefault, Value
+from django.db.models.lookups import Exact, In
 from django.db.models.sql import compiler
+from django.db.models.sql.constants import (
+    CURSOR, GET_ITERATOR_CHUNK_SIZE, MULTI, SINGLE,
+)
+from django.db.models.sql.where import WhereNode
 
+from .cache import get_tables
+from .expressions import FlattenTable
+from .sequences import allocator
+
+
+class ConvertedBatches:
+    """
+    The batches of rows returned by SQLCompiler.execute_sql() with
+    OPTIONS['arrow_fetch'], which already have the converters applied.
+    """
+
+    def __init__(self, batches):
+        self.batches = batches
+
+    def __iter__(self):
+        return iter(self.batches)
+
+
+class SQLCompiler(compiler.SQLCompiler):
+    def execute_sql(self, result_type=MULTI, chunked_fetch=False, chunk_size=GET_ITERATOR_CHUNK_SIZE):
+        """
+        If OPTIONS['arrow_fetch'] is enabled, fetch the rows of MULTI results
+        as Arrow record batches rather than with fetchmany().
+        """
+        # The warehouse from WarehouseQuerySet.using_warehouse().
+        warehouse = getattr(self.query, 'warehouse', None)
+        with self.connection.use_warehouse(warehouse) if warehouse else nullcontext():
+            if (
+                result_type in (MULTI, SINGLE)
+                and not chunked_fetch
+                and (result_cache := self.connection.result_cache) is not None
+                # Results in a transaction may include its uncommitted changes.
+                and not self.connection.in_atomic_block
+                and not self.query.select_for_update
+            ):
+                return self.execute_sql_cached(result_cache, result_type)
+            if result_type != MULTI or not self.connection.settings_dict['OPTIONS'].get('arrow_fetch'):
+                return super().execute_sql(result_type, chunked_fetch, chunk_size)
+            cursor = super().execute_sql(CURSOR)
+            if cursor is None:
+                # The query would return an empty result.
+                return iter([])
+            converters = self.get_converters([s[0] for s in self.select[0:self.col_count]])
+            result = self.arrow_batches_iter(cursor, chunk_size, converters)
+            if not chunked_fetch or not self.connection.features.can_use_chunked_reads:
+                result = list(result)
+            return ConvertedBatches(result)
+
+    def results_iter(
+        self, results=None, tuple_expected=False, chunked_fetch=False, chunk_size=GET_ITERATOR_CHUNK_SIZE,
+    ):
+        """
+        Overridden to not apply the converters again to the rows of
+        arrow_batches_iter().
+        """
+        if results is None:
+            results = self.execute_sql(MULTI, chunked_fetch=chunked_fetch, chunk_size=chunk_size)
+        if not isinstance(results, ConvertedBatches):
+            return super().results_iter(results, tuple_expected, chunked_fetch, chunk_size)
+        fields = [s[0] for s in self.select[0:self.col_count]]
+        rows = chain.from_iterable(results)
+        if self.has_composite_fields(fields):
+            rows = self.composite_fields_to_tuples(rows, fields)
+        if tuple_expected:
+            rows = map(tuple, rows)
+        return rows
+
+    def execute_sql_cached(self, result_cache, result_type):
+        """
+        Return the MULTI or SINGLE result of the query from
+        OPTIONS['result_cache'], executing the query if it isn't cached.
+        """
+        try:
+            sql, params = self.as_sql()
+            if not sql:
+                raise EmptyResultSet
+        except EmptyResultSet:
+            return iter([]) if result_type == MULTI else None
+        if (tables := get_tables(sql)) is None:
+            return super().execute_sql(result_type)
+        key = result_cache.make_key(self.connection, sql, params, tables)
+        last_altered = self.get_last_altered(tables) if result_cache.check_last_altered else None
+        cached = result_cache.get(key)
+        if cached is not None and cached[1] == last_altered:
+            rows = cached[0]
+        else:
+            with self.connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                rows = cursor.fetchall() if result_type == MULTI else cursor.fetchmany(1)
+            if self.has_extra_select:
+                rows = [row[:self.col_count] for row in rows]
+            result_cache.set(key, (rows, last_altered))
+        if result_type == MULTI:
+            return [rows] if rows else []
+        return rows[0] if rows else None
+
+    def get_last_altered(self, tables):
+        """
+        Return the LAST_ALTERED times of the given tables in the current
+        schema, which change when other clients write to them.
+        """
+        names = [table.strip('"') for table in tables]
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT TABLE_NAME, LAST_ALTERED FROM INFORMATION_SCHEMA.TABLES '
+                'WHERE TABLE_SCHEMA = CURRENT_SCHEMA() AND TABLE_NAME IN (%s) ORDER BY TABLE_NAME'
+                % ', '.join(['%s'] * len(names)),
+                names,
+            )
+            return cursor.fetchall()
+
+    def invalidate_result_cache(self):
+        """Invalidate the cached results of queries that read this query's table."""
+        self.connection.invalidate_result_cache([self.quote_name_unless_alias(self.query.get_meta().db_table)])
+
+    def as_sql(self, with_limits=True, with_col_aliases=False):
+        sql, params = super().as_sql(with_limits, with_col_aliases)
+        if query_id := getattr(self.query, 'async_query_id', None):
+            # The query was submitted by asynchronous.submit(). Fetch its
+            # result rather than executing it again.
+            return 'SELECT * FROM TABLE(RESULT_SCAN(%s))', (query_id,)
+        return sql, params
+
+    def get_from_clause(self):
+        """
+        Overridden to put LATERAL FLATTEN()s (see expressions.Flatten) after
+        the joins, since a join's ON clause can't reference the tables before
+        a comma.
+        """
+        alias_map = self.query.alias_map
+        if not any(isinstance(table, FlattenTable) for table in alias_map.values()):
+            return super().get_from_clause()
+        result = []
+        params = []
+        tables = sorted(alias_map.items(), key=lambda item: isinstance(item[1], FlattenTable))
+        for alias, from_clause in tables:
+            if not self.query.alias_refcount[alias]:
+                continue
+            clause_sql, clause_params = self.compile(from_clause)
+            result.append(clause_sql)
+            params.extend(clause_params)
+        for table in self.query.extra_tables:
+            alias, _ = self.query.table_alias(table)
+            if alias not in alias_map or self.query.alias_refcount[alias] == 1:
+                result.append(', %s' % self.quote_name_unless_alias(alias))
+        return result, params
+
+    def arrow_batches_iter(self, cursor, chunk_size, converters):
+        """
+        Yield a list of rows for each Arrow record batch in the cursor's
+        result. Each column is converted to Python objects, and then by its
+        converters (see apply_column_converters()), at once.
+        """
+        col_count = self.col_count if self.has_extra_select else None
+        try:
+            try:
+                batches = cursor.fetch_arrow_batches()
+            except self.connection.Database.NotSupportedError:
+                # Results that Snowflake returns in JSON format (rather than
+                # Arrow) must be fetched and converted row by row.
+                for rows in compiler.cursor_iter(
+                    cursor,
+                    self.connection.features.empty_fetchmany_value,
+                    col_count,
+                    chunk_size,
+                ):
+                    yield list(self.apply_converters(rows, converters)) if converters else rows
+                return
+            for table in batches:
+                columns = [self.arrow_column_to_pylist(column) for column in table.columns[:col_count]]
+                if converters:
+                    self.apply_column_converters(columns, converters)
+                yield list(zip(*columns))
+        finally:
+            cursor.close()
+
+    def apply_column_converters(self, columns, converters):
+        """
+        Like apply_converters(), but convert lists of column values in place.
+        The backend's converters that have a column version (see
+        DatabaseOperations.get_db_column_converter()) are called once per
+        column. Other converters (e.g. a field's from_db_value()) are called
+        for each value.
+        """
+        connection = self.connection
+        for pos, (convs, expression) in converters.items():
+            values = columns[pos]
+            for converter in convs:
+                if column_converter := connection.ops.get_db_column_converter(converter):
+                    values = column_converter(values, expression, connection)
+                else:
+                    values = [converter(value, expression, connection) for value in values]
+            columns[pos] = values
+
+    @staticmethod
+    def arrow_column_to_pylist(column):
+        """
+        Convert an Arrow column to a list of the Python objects that
+        fetchmany() would return.
+        """
+        import pyarrow as pa
+
+        # pyarrow returns nanosecond timestamps and times as pandas objects
+        # (or raises an error if pandas isn't installed), while the connector
+        # truncates them to microseconds.
+        if pa.types.is_timestamp(column.type) and column.type.unit == 'ns':
+            column = column.cast(pa.timestamp('us', column.type.tz), safe=False)
+        elif pa.types.is_time64(column.type) and column.type.unit == 'ns':
+            column = column.cast(pa.time64('us'), safe=False)
+        return column.to_pylist()
+
+
+class SQLInsertCompiler(compiler.SQLInsertCompiler, SQLCompiler):
+    # The maximum number of rows in each file uploaded by copy_insert().
+    copy_chunk_size = 100000
 
-class SQLInsertCompiler(compiler.SQLInsertCompiler):
     def as_sql(self):
         """Overridden to to wrap JSONField values with parse_json()."""
+        if self.query.on_conflict is not None and (conflict_targets := self.get_conflict_targets()):
+            return self.as_merge_sql(conflict_targets)
         # We don't need quote_name_unless_alias() here, since these are all
         # going to be column names (so we can avoid the extra overhead).
         qn = self.connection.ops.quote_name
@@ -18,8 +248,6 @@ class SQLInsertCompiler(compiler.SQLInsertCompiler):
         result = ["%s %s" % (insert_statement, qn(opts.db_table))]
         select_columns = []
         if fields := list(self.query.fields):
-            from django.db.models.expressions import DatabaseDefault
-
             supports_default_keyword_in_bulk_insert = (
                 self.connection.features.supports_default_keyword_in_bulk_insert
             )
@@ -141,8 +369,424 @@ class SQLInsertCompiler(compiler.SQLInsertCompiler):
                 for p, vals in zip(placeholder_rows, param_rows)
             ]
 
+    def get_conflict_targets(self):
+        """
+        Return lists of the fields whose values identify an existing row that
+        conflicts with an inserted row. Snowflake doesn't enforce unique
+        constraints, so conflicts are found with MERGE rather than INSERT ...
+        ON CONFLICT. Sets of fields that aren't all inserted can't conflict.
+        """
+        if self.query.on_conflict == OnConflict.UPDATE:
+            targets = [self.query.unique_fields]
+        else:
+            opts = self.query.get_meta()
+            targets = [
+                *([field] for field in opts.concrete_fields if field.unique),
+                *([opts.get_field(name) for name in fields] for fields in opts.unique_together),
+                *(
+                    [opts.get_field(name) for name in constraint.fields]
+                    for constraint in opts.total_unique_constraints
+                ),
+            ]
+        fields = set(self.query.fields)
+        return [target for target in targets if target and fields.issuperset(target)]
+
+    def as_merge_sql(self, conflict_targets):
+        """
+        Return a MERGE statement that inserts the rows that don't match an
+        existing row on any of conflict_targets and, for
+        bulk_create(update_conflicts=True), updates the ones that do.
+        """
+        qn = self.connection.ops.quote_name
+        table = qn(self.query.get_meta().db_table)
+        fields = list(self.query.fields)
+        value_cols = []
+        for field in fields:
+            field_prepare = partial(self.prepare_value, field)
+            field_values = [field_prepare(self.pre_save_val(field, obj)) for obj in self.query.objs]
+            if field.has_db_default():
+                # DEFAULT isn't allowed in a subquery's VALUES.
+                prepared_db_default = field_prepare(field.db_default)
+                field_values = [
+                    prepared_db_default if isinstance(value, DatabaseDefault) else value
+                    for value in field_values
+                ]
+            value_cols.append(field_values)
+        placeholder_rows, param_rows = self.assemble_as_sql(fields, list(zip(*value_cols)))
+        columns = [qn(field.column) for field in fields]
+        source_columns = ', '.join(
+            '%s AS %s' % (f'parse_json(${i})' if isinstance(field, JSONField) else f'${i}', column)
+            for i, (field, column) in enumerate(zip(fields, columns), 1)
+        )
+        source = 'SELECT %s FROM %s' % (
+            source_columns, self.connection.ops.bulk_insert_sql(fields, placeholder_rows)
+        )
+        condition = ' OR '.join(
+            '(%s)' % ' AND '.join(
+                f'{table}.{qn(field.column)} = "SOURCE".{qn(field.column)}' for field in target
+            )
+            for target in conflict_targets
+        )
+        result = [f'MERGE INTO {table} USING ({source}) AS "SOURCE" ON {condition}']
+        if self.query.on_conflict == OnConflict.UPDATE:
+            result.append('WHEN MATCHED THEN UPDATE SET %s' % ', '.join(
+                f'{qn(field.column)} = "SOURCE".{qn(field.column)}' for field in self.query.update_fields
+            ))
+        result.append('WHEN NOT MATCHED THEN INSERT (%s) VALUES (%s)' % (
+            ', '.join(columns), ', '.join(f'"SOURCE".{column}' for column in columns),
+        ))
+        return [(' '.join(result), tuple(chain.from_iterable(param_rows)))]
+
+    def execute_sql(self, returning_fields=None):
+        if self.query.on_conflict is not None:
+            # MERGE can't return values from the rows it inserts or updates.
+            returning_fields = None
+        self.returning_fields = returning_fields
+        try:
+            if self.can_emulate_returning():
+                return self.execute_sql_with_returning()
+            if self.connection.features.can_return_columns_from_insert:
+                # The values of the returning fields can't be known, e.g. a
+                # primary key with a db_default.
+                self.returning_fields = None
+            pk = self.query.get_meta().pk
+            # Replaying an insert that AUTOINCREMENT assigns primary keys to
+            # (for emulated savepoints) would assign different ones.
+            with (
+                self.connection.journal_unreplayable(
+                    "Can't roll back to a savepoint created after inserting rows with AUTOINCREMENT primary "
+                    "keys since replaying the inserts would generate different primary keys. Use "
+                    "OPTIONS['pk_sequences'] or set the primary keys explicitly."
+                )
+                if isinstance(pk, AutoField) and pk not in self.query.fields else nullcontext()
+            ):
+                if self.can_copy_insert():
+                    copy_fields, value_rows = self.get_copy_values()
+                    if copy_fields:
+                        # The uploaded files are deleted after loading, so the
+                        # load can't be replayed.
+                        with self.connection.journal_unreplayable(
+                            "Can't roll back to a savepoint created after bulk_create() loaded rows with COPY "
+                            "INTO (see OPTIONS['bulk_copy_threshold']) since the uploaded files can't be "
+                            "loaded again."
+                        ):
+                            self.copy_insert(copy_fields, value_rows)
+                        return []
+                if (executemany_sql := self.as_executemany_sql()) is not None:
+                    sql, param_rows = executemany_sql
+                    with self.connection.cursor() as cursor:
+                        cursor.executemany(sql, param_rows)
+                    return []
+                return super().execute_sql(self.returning_fields)
+        finally:
+            self.invalidate_result_cache()
+
+    def can_emulate_returning(self):
+        """
+        Return True if the values of the returning fields can be returned
+        after inserting (OPTIONS['pk_sequences']): either the primary keys
+        are known or they're allocated from the table's sequence.
+        """
+        if not (
+            bool(self.connection.settings_dict['OPTIONS'].get('pk_sequences'))
+            and self.returning_fields
+            and self.query.on_conflict is None
+        ):
+            return False
+        opts = self.query.get_meta()
+        if opts.is_composite_pk:
+            return False
+        if isinstance(opts.pk, AutoField) and opts.pk not in self.query.fields:
+            return True
+        return opts.pk in self.query.fields and all(obj.pk is not None for obj in self.query.objs)
+
+    def execute_sql_with_returning(self):
+        """
+        Emulate INSERT ... RETURNING. Allocate the primary keys from the
+        table's sequence (if they aren't set), insert, and then fetch the
+        values of the other returning fields (e.g. fields with a db_default)
+        with one query.
+        """
+        opts = self.query.get_meta()
+        pk = opts.pk
+        if pk not in self.query.fields:
+            pk_values = allocator.allocate(self.connection, opts.db_table, pk.column, len(self.query.objs))
+            for obj, value in zip(self.query.objs, pk_values):
+                setattr(obj, pk.attname, value)
+            self.query.fields = [pk, *self.query.fields]
+        returning_fields = self.returning_fields
+        # The primary keys are known so the INSERT doesn't need to return
+        # anything (and may use COPY INTO).
+        self.execute_sql()
+        pk_values = [obj.pk for obj in self.query.objs]
+        other_fields = [field for field in returning_fields if field is not pk]
+        if not other_fields:
+            return [(value,) for value in pk_values]
+        queryset = opts.base_manager.using(self.using)
+        if isinstance(pk, AutoField):
+            # Sequence values are mostly consecutive, so a range avoids
+            # binding thousands of parameters. Rows inserted concurrently
+            # within the range are ignored.
+            queryset = queryset.filter(pk__range=(min(pk_values), max(pk_values)))
+        else:
+            queryset = queryset.filter(pk__in=pk_values)
+        fetched = {
+            row[0]: row[1:]
+            for row in queryset.values_list(pk.attname, *(field.attname for field in other_fields))
+        }
+        rows = []
+        for value in pk_values:
+            other_values = iter(fetched[value])
+            rows.append(tuple(value if field is pk else next(other_values) for field in returning_fields))
+        return rows
+
+    def as_executemany_sql(self):
+        """
+        With OPTIONS['server_side_binding'], return the SQL to insert one row
+        and the parameters of each row, for executemany(). The connector then
+        binds arrays of values (uploading large ones to a stage) rather than
+        each row having its own placeholders.
+
+        Return None if the rows can't be inserted this way, e.g. if some
+        values are expressions.
+        """
+        fields = self.query.fields
+        if not (
+            self.connection.settings_dict['OPTIONS'].get('server_side_binding')
+            and len(self.query.objs) > 1
+            and fields
+            and not self.returning_fields
+            and self.query.on_conflict is None
+            # JSONField values require parse_json() (see as_sql()).
+            and not any(isinstance(field, JSONField) for field in fields)
+        ):
+            return None
+        value_rows = [
+            [self.prepare_value(field, self.pre_save_val(field, obj)) for field in fields]
+            for obj in self.query.objs
+        ]
+        placeholder_rows, param_rows = self.assemble_as_sql(fields, value_rows)
+        if any(placeholder != '%s' for row in placeholder_rows for placeholder in row):
+            return None
+        qn = self.connection.ops.quote_name
+        sql = '%s %s (%s) VALUES (%s)' % (
+            self.connection.ops.insert_statement(),
+            qn(self.query.get_meta().db_table),
+            ', '.join(qn(field.column) for field in fields),
+            ', '.join(['%s'] * len(fields)),
+        )
+        return sql, [tuple(params) for params in param_rows]
+
+    def can_copy_insert(self):
+        """
+        Return True if the rows should be loaded using PUT and COPY INTO
+        rather than INSERT. This is enabled by
+        DATABASES[...]['OPTIONS']['bulk_copy_threshold'].
+        """
+        threshold = self.connection.settings_dict['OPTIONS'].get('bulk_copy_threshold')
+        return (
+            threshold is not None
+            and len(self.query.objs) >= threshold
+            and not self.returning_fields
+            and self.query.on_conflict is None
+            and bool(self.query.fields)
+        )
+
+    def get_copy_values(self):
+        """
+        Return the fields and rows of values to load with copy_insert(), or
+        ([], []) if some values are expressions which can only be inserted
+        with SQL.
+        """
+        fields = []
+        value_cols = []
+        for field in self.query.fields:
+            field_values = [
+                self.prepare_value(field, self.pre_save_val(field, obj))
+                for obj in self.query.objs
+            ]
+            # Omit columns where every value is the database default.
+            if field.has_db_default() and all(
+                isinstance(value, DatabaseDefault) for value in field_values
+            ):
+                continue
+            if any(hasattr(value, 'as_sql') for value in field_values):
+                return [], []
+            fields.append(field)
+            value_cols.append(field_values)
+        return fields, list(zip(*value_cols))
+
+    @staticmethod
+    def copy_value(value):
+        """Convert a prepared value to its representation in a CSV file."""
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        if isinstance(value, (bytes, memoryview)):
+            # Loaded with BINARY_FORMAT = HEX.
+            return bytes(value).hex()
+        return value
+
+    def copy_insert(self, fields, value_rows):
+        """
+        Write the rows to gzipped CSV files, upload them to the user stage
+        with PUT, and load them with COPY INTO. The user stage is used
+        because creating a stage is DDL which would implicitly commit an
+        active transaction (and table stages don't support the transformation
+        needed to load JSONField values with parse_json()).
+        """
+        qn = self.connection.ops.quote_name
+        opts = self.query.get_meta()
+        stage_path = '@~/django_snowflake/%s' % uuid.uuid4().hex
+        select_columns = [
+            f'parse_json(${i})' if isinstance(field, JSONField) else f'${i}'
+            for i, field in enumerate(fields, 1)
+        ]
+        copy_sql = (
+            "COPY INTO %(table)s (%(columns)s) FROM (SELECT %(select)s FROM %(stage)s/) "
+            "FILE_FORMAT = (TYPE = CSV COMPRESSION = GZIP FIELD_OPTIONALLY_ENCLOSED_BY = '\"' "
+            "BINARY_FORMAT = HEX) PURGE = TRUE" % {
+                'table': qn(opts.db_table),
+                'columns': ', '.join(qn(field.column) for field in fields),
+                'select': ', '.join(select_columns),
+                'stage': stage_path,
+            }
+        )
+        with tempfile.TemporaryDirectory() as directory, self.connection.cursor() as cursor:
+            for start in range(0, len(value_rows), self.copy_chunk_size):
+                filename = os.path.join(directory, 'rows_%08d.csv.gz' % start)
+                with gzip.open(filename, 'wt', newline='', encoding='utf-8') as f:
+                    # Quote everything except None so that Snowflake loads
+                    # unquoted empty fields as NULL and "" as an empty string.
+                    writer = csv.writer(f, quoting=csv.QUOTE_NOTNULL)
+                    writer.writerows(
+                        [self.copy_value(value) for value in row]
+                        for row in value_rows[start:start + self.copy_chunk_size]
+                    )
+            source = os.path.join(directory, '*.csv.gz').replace('\\', '/')
+            cursor.execute(
+                f"PUT 'file://{source}' {stage_path} AUTO_COMPRESS = FALSE "
+                f"SOURCE_COMPRESSION = GZIP"
+            )
+            try:
+                cursor.execute(copy_sql)
+            except Exception:
+                # PURGE = TRUE removes the files only if the load succeeds.
+                cursor.execute(f'REMOVE {stage_path}/')
+                raise
+
+
+class SQLDeleteCompiler(compiler.SQLDeleteCompiler, SQLCompiler):
+    def execute_sql(self, result_type=MULTI):
+        try:
+            return super().execute_sql(result_type)
+        finally:
+            self.invalidate_result_cache()
+
+
+class SQLUpdateCompiler(compiler.SQLUpdateCompiler, SQLCompiler):
+    def execute_sql(self, result_type):
+        try:
+            return super().execute_sql(result_type)
+        finally:
+            self.invalidate_result_cache()
+
+    def as_sql(self):
+        if (bulk_update_values := self.get_bulk_update_values()) is not None:
+            return self.as_bulk_update_sql(*bulk_update_values)
+        return super().as_sql()
+
+    def get_bulk_update_values(self):
+        """
+        If this query is from QuerySet.bulk_update(), i.e. each value is
+        Case(When(pk=pk, then=Value(value)), ...), return a list of the
+        primary keys and a list of (field, values) for each updated field.
+        Otherwise, return None.
+        """
+        pk = self.query.get_meta().pk
+        pks = None
+        field_values = []
+        for field, _, case in self.query.values:
+            if (
+                not isinstance(case, Case) or
+                not isinstance(case.default, Value) or case.default.value is not None
+            ):
+                return None
+            case_pks = []
+            values = []
+            for when in case.cases:
+                condition = when.condition
+                if not (
+                    isinstance(when.result, Value) and
+                    isinstance(condition, WhereNode) and len(condition.children) == 1 and
+                    isinstance(lookup := condition.children[0], Exact) and
+                    isinstance(lookup.lhs, Col) and lookup.lhs.target == pk and
+                    not hasattr(lookup.rhs, 'resolve_expression')
+                ):
+                    return None
+                case_pks.append(lookup.rhs)
+                values.append(when.result)
+            if pks is None:
+                pks = case_pks
+            elif case_pks != pks:
+                return None
+            field_values.append((field, values))
+        if not pks:
+            return None
+        return pks, field_values
+
+    def as_bulk_update_sql(self, pks, field_values):
+        """
+        Return an UPDATE that joins the table to the new values, e.g.
+        UPDATE t SET c = "V"."C" FROM (SELECT $1 AS "PK", $2 AS "C" FROM
+        VALUES (...), ...) AS "V" WHERE t.pk = "V"."PK", rather than using
+        a CASE expression for each field.
+        """
+        self.pre_sql_setup()
+        qn = self.connection.ops.quote_name
+        pk = self.query.get_meta().pk
+        table = qn(self.query.base_table)
+        source_columns = ['$1 AS "PK"']
+        set_columns = []
+        for i, (field, _) in enumerate(field_values, 2):
+            column = qn(field.column)
+            source_columns.append(
+                '%s AS %s' % (f'parse_json(${i})' if isinstance(field, JSONField) else f'${i}', column)
+            )
+            set_columns.append(f'{column} = "V".{column}')
+        placeholder_rows = []
+        params = []
+        for row, row_pk in enumerate(pks):
+            placeholders = ['%s']
+            params.append(pk.get_db_prep_value(row_pk, self.connection, prepared=True))
+            for _, values in field_values:
+                sql, value_params = self.compile(values[row])
+                placeholders.append(sql)
+                params.extend(value_params)
+            placeholder_rows.append('(%s)' % ', '.join(placeholders))
+        result = [
+            'UPDATE %s SET %s' % (table, ', '.join(set_columns)),
+            'FROM (SELECT %s FROM VALUES %s) AS "V"' % (', '.join(source_columns), ', '.join(placeholder_rows)),
+            'WHERE %s.%s = "V"."PK"' % (table, qn(pk.column)),
+        ]
+        # The pk__in filter added by bulk_update() is redundant with the
+        # join. Keep any other filters.
+        where = WhereNode([
+            child for child in self.query.where.children
+            if not (
+                isinstance(child, In) and isinstance(child.lhs, Col) and
+                child.lhs.target == pk and set(child.rhs) == set(pks)
+            )
+        ], connector=self.query.where.connector, negated=self.query.where.negated)
+        if where.children:
+            try:
+                where_sql, where_params = self.compile(where)
+            except FullResultSet:
+                pass
+            else:
+                result.append('AND (%s)' % where_sql)
+                params.extend(where_params)
+        return ' '.join(result), tuple(params)
+
 
-SQLCompiler = compiler.SQLCompiler
-SQLDeleteCompiler = compiler.SQLDeleteCompiler
-SQLUpdateCompiler = compiler.SQLUpdateCompiler
-SQLAggregateCompiler = compiler.SQLAggregateCompiler
+class SQLAggregateCompiler(compiler.SQLAggregateCompiler, SQLCompiler):
+    pass
@@ -2,6 +2,8 @@ import sys
 
 from django.db.backends.base.creation import BaseDatabaseCreation
 
+from .sequences import allocator
+
 
 class DatabaseCreation(BaseDatabaseCreation):
     destroy_test_db_connection_close_method = 'close'
@@ -26,6 +28,12 @@ class DatabaseCreation(BaseDatabaseCreation):
         schema_name = self._quote_name(self.connection.settings_dict['SCHEMA'])
         cursor.execute(f'CREATE SCHEMA IF NOT EXISTS {schema_name}')
 
+    def _create_test_db(self, verbosity, autoclobber, keepdb=False):
+        # Pooled connections use the database that was configured when they
+        # were opened.
+        self.connection.close_pool()
+        return super()._create_test_db(verbosity, autoclobber, keepdb)
+
     def _clone_test_db(self, suffix, verbosity, keepdb=False):
         source_database_name = self.connection.settings_dict['NAME']
         target_database_name = self.get_test_db_clone_settings(suffix)['NAME']
@@ -47,3 +55,45 @@ class DatabaseCreation(BaseDatabaseCreation):
                 except Exception as e:
                     self.log('Got an error cloning the test database: %s' % e)
                     sys.exit(2)
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        self.connection.close_pool()
+        return super()._destroy_test_db(test_database_name, verbosity)
+
+    def _snapshot_name(self, name):
+        return self._quote_name('%s_%s' % (self.connection.settings_dict['SCHEMA'], name))
+
+    def snapshot_schema(self, name):
+        """
+        Record the contents of the test schema as a zero-copy clone that can
+        be restored with restore_schema(name).
+        """
+        schema_name = self._quote_name(self.connection.settings_dict['SCHEMA'])
+        self.connection.execute_batch([
+            f'CREATE OR REPLACE SCHEMA {self._snapshot_name(name)} CLONE {schema_name}',
+            # CREATE SCHEMA changes the session's current schema.
+            f'USE SCHEMA {schema_name}',
+        ])
+
+    def restore_schema(self, name):
+        """
+        Restore the test schema from the snapshot_schema(name) snapshot by
+        swapping it with a clone of the snapshot, which is kept for later
+        restores.
+        """
+        schema_name = self._quote_name(self.connection.settings_dict['SCHEMA'])
+        restored_name = self._snapshot_name('RESTORED')
+        self.connection.execute_batch([
+            f'CREATE OR REPLACE SCHEMA {restored_name} CLONE {self._snapshot_name(name)}',
+            f'ALTER SCHEMA {schema_name} SWAP WITH {restored_name}',
+            f'DROP SCHEMA {restored_name}',
+            f'USE SCHEMA {schema_name}',
+        ])
+        # The schema's sequences and data are restored, so unused sequence
+        # values and cached results and metadata are stale.
+        allocator.clear()
+        self.connection.clear_result_cache()
+        self.connection.introspection.clear_schema_metadata()
+
+    def drop_schema_snapshot(self, name):
+        self.connection.execute_batch([f'DROP SCHEMA IF EXISTS {self._snapshot_name(name)}'])
@@ -0,0 +1,165 @@
+import queue
+import threading
+from contextlib import contextmanager
+from itertools import islice
+
+from django.db.backends import utils
+from django.utils.regex_helper import _lazy_re_compile
+
+# Marks the end of a result in StreamingCursor's queue.
+_END = object()
+# Django's placeholders and escaped percent signs.
+format_placeholder_re = _lazy_re_compile(r'%([s%])')
+
+
+def to_qmark(sql):
+    """Convert Django's %s placeholders (and %% escapes) to qmark style."""
+    return format_placeholder_re.sub(lambda match: '?' if match[1] == 's' else '%', sql)
+
+
+class StreamingCursor:
+    """
+    Wrap a snowflake.connector cursor to download a query's result one batch
+    at a time (using the connector's get_result_batches()) as rows are
+    fetched, rather than downloading the whole result.
+
+    If prefetch_depth is greater than zero, a background thread downloads
+    up to that many batches ahead of the batch being read.
+    """
+
+    def __init__(self, cursor, prefetch_depth=1):
+        self.cursor = cursor
+        self.prefetch_depth = prefetch_depth
+        self._rows = iter(())
+        self._stop = None
+
+    def __getattr__(self, attr):
+        return getattr(self.cursor, attr)
+
+    def __iter__(self):
+        return self._rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def execute(self, sql, params=None):
+        self._stop_prefetch()
+        self.cursor.execute(sql, params)
+        batches = self.cursor.get_result_batches() or []
+        if self.prefetch_depth > 0:
+            batch_rows = self._prefetch(batches)
+        else:
+            batch_rows = (list(batch) for batch in batches)
+        self._rows = (row for rows in batch_rows for row in rows)
+        return self
+
+    def fetchone(self):
+        return next(self._rows, None)
+
+    def fetchmany(self, size=None):
+        return list(islice(self._rows, size or self.cursor.arraysize))
+
+    def fetchall(self):
+        return list(self._rows)
+
+    def close(self):
+        self._stop_prefetch()
+        self._rows = iter(())
+        self.cursor.close()
+
+    def _prefetch(self, batches):
+        """
+        Yield the rows of each batch, downloaded by a background thread that
+        stays at most prefetch_depth batches ahead.
+        """
+        downloaded = queue.Queue()
+        # A slot is taken before downloading a batch and released when the
+        # consumer moves on to it, so at most prefetch_depth batches are
+        # downloaded (or downloading) ahead of the one being read.
+        slots = threading.Semaphore(self.prefetch_depth)
+        stop = self._stop = threading.Event()
+
+        def take_slot():
+            # Give up if the cursor is closed before the consumer catches up.
+            while not stop.is_set():
+                if slots.acquire(timeout=0.1):
+                    return True
+            return False
+
+        def download():
+            try:
+                for batch in batches:
+                    if not take_slot():
+                        return
+                    downloaded.put(list(batch))
+                downloaded.put(_END)
+            except Exception as e:
+                downloaded.put(e)
+
+        threading.Thread(target=download, daemon=True).start()
+        while (item := downloaded.get()) is not _END:
+            if isinstance(item, Exception):
+                raise item
+            slots.release()
+            yield item
+
+    def _stop_prefetch(self):
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+
+
+class ServerSideBindingCursor:
+    """
+    Wrap a snowflake.connector cursor that binds parameters on the server
+    (the qmark paramstyle, OPTIONS['server_side_binding']) so that it accepts
+    the %s placeholders of Django's SQL.
+    """
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def __getattr__(self, attr):
+        return getattr(self.cursor, attr)
+
+    def __iter__(self):
+        return iter(self.cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.cursor.close()
+
+    def execute(self, sql, params=None, **kwargs):
+        if params is not None:
+            sql = to_qmark(sql)
+        self.cursor.execute(sql, params, **kwargs)
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor.executemany(to_qmark(sql), seq_of_params)
+
+    def execute_async(self, sql, params=None, **kwargs):
+        if params is not None:
+            sql = to_qmark(sql)
+        return self.cursor.execute_async(sql, params, **kwargs)
+
+
+class CursorDebugWrapper(utils.CursorDebugWrapper):
+    """
+    Record the Snowflake query ID ('sfqid') of each query in
+    connection.queries, e.g. to look up its profile in QUERY_HISTORY.
+    """
+
+    @contextmanager
+    def debug_sql(self, sql=None, params=None, use_last_executed_query=False, many=False):
+        try:
+            with super().debug_sql(sql, params, use_last_executed_query, many):
+                yield
+        finally:
+            if self.db.queries_log:
+                self.db.queries_log[-1]['sfqid'] = getattr(self.cursor, 'sfqid', None)
@@ -1,4 +1,8 @@
-from django.db.models.expressions import Exists
+from django.db.models import CharField, F, IntegerField, JSONField
+from django.db.models.expressions import Exists, Expression
+from django.db.models.sql.datastructures import BaseTable
+
+from .lookups import compile_variant, is_variant_transform
 
 
 def exists(self, compiler, connection):
@@ -9,5 +13,109 @@ def exists(self, compiler, connection):
     return self.as_sql(compiler, connection)
 
 
+class FlattenTable(BaseTable):
+    """
+    A LATERAL FLATTEN() table function in a query's FROM clause. It's added
+    to Query.alias_map by Flatten.resolve_expression().
+    """
+
+    def __init__(self, table_name, alias, expression, outer=False):
+        super().__init__(table_name, alias)
+        self.expression = expression
+        self.outer = outer
+
+    def as_sql(self, compiler, connection):
+        if is_variant_transform(self.expression):
+            sql, params = compile_variant(self.expression, compiler, connection)
+        else:
+            sql, params = compiler.compile(self.expression)
+        outer = ', OUTER => TRUE' if self.outer else ''
+        alias = compiler.quote_name_unless_alias(self.table_alias)
+        return f', LATERAL FLATTEN(INPUT => {sql}{outer}) {alias}', params
+
+    def relabeled_clone(self, change_map):
+        return self.__class__(
+            self.table_name,
+            change_map.get(self.table_alias, self.table_alias),
+            self.expression.relabeled_clone(change_map),
+            self.outer,
+        )
+
+    @property
+    def identity(self):
+        return self.__class__, self.table_name, self.table_alias, self.expression, self.outer
+
+
+class FlattenColumn(Expression):
+    """A column of a FlattenTable."""
+
+    def __init__(self, alias, column, output_field):
+        super().__init__(output_field=output_field)
+        self.alias = alias
+        self.column = column
+
+    def as_sql(self, compiler, connection):
+        return '%s.%s' % (compiler.quote_name_unless_alias(self.alias), connection.ops.quote_name(self.column)), []
+
+    def relabeled_clone(self, change_map):
+        return self.__class__(change_map.get(self.alias, self.alias), self.column, self.output_field)
+
+
+class Flatten(Expression):
+    """
+    A column of the rows that Snowflake's FLATTEN() table function makes
+    from the elements of an array or object (e.g. a JSONField or a key of
+    one), so that they can be filtered and aggregated in the warehouse:
+
+        Event.objects.annotate(
+            item=Flatten('data__items'),
+            position=Flatten('data__items', 'index'),
+        ).values(sku=F('item__sku')).annotate(count=Count('*'))
+
+    Each row of the queryset is repeated for each element. Flatten()s of the
+    same expression share one LATERAL FLATTEN(). If outer is True, rows
+    whose array or object is empty (or NULL) are kept (with NULL columns).
+    https://docs.snowflake.com/en/sql-reference/functions/flatten
+    """
+    columns = {
+        'value': JSONField,
+        'index': IntegerField,
+        'key': CharField,
+        'path': CharField,
+        'seq': IntegerField,
+        'this': JSONField,
+    }
+
+    def __init__(self, expression, column='value', outer=False):
+        if column not in self.columns:
+            raise ValueError('Flatten.column must be one of: %s.' % ', '.join(self.columns))
+        super().__init__(output_field=self.columns[column]())
+        self.expression = F(expression) if isinstance(expression, str) else expression
+        self.column = column
+        self.outer = outer
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.expression!r}, {self.column!r})'
+
+    def get_source_expressions(self):
+        return [self.expression]
+
+    def set_source_expressions(self, exprs):
+        (self.expression,) = exprs
+
+    def resolve_expression(self, query=None, allow_joins=True, reuse=None, summarize=False, for_save=False):
+        if not allow_joins:
+            raise ValueError('Flatten() is not allowed in this query.')
+        expression = self.expression.resolve_expression(query, allow_joins, reuse, summarize, for_save)
+        for alias, table in query.alias_map.items():
+            if isinstance(table, FlattenTable) and table.expression == expression and table.outer == self.outer:
+                query.ref_alias(alias)
+                break
+        else:
+            alias, _ = query.table_alias('flatten', create=True)
+            query.alias_map[alias] = FlattenTable('flatten', alias, expression, self.outer)
+        return FlattenColumn(alias, self.column, self.output_field)
+
+
 def register_expressions():
     Exists.as_snowflake = exists
@@ -38,11 +38,11 @@ class DatabaseFeatures(BaseDatabaseFeatures):
     supports_column_check_constraints = False
     supports_table_check_constraints = False
     supports_expression_indexes = False
-    supports_ignore_conflicts = False
+    # Conflicts are handled with MERGE (see SQLInsertCompiler.as_merge_sql()).
+    supports_ignore_conflicts = True
     # This feature is specific to the Django fork used for testing.
     supports_indexes = False
     supports_index_column_ordering = False
-    supports_json_field_contains = False
     # This feature is specific to the Django fork used for testing.
     supports_limit_in_exists = False
     supports_json_negative_indexing = False
@@ -60,8 +60,9 @@ class DatabaseFeatures(BaseDatabaseFeatures):
     supports_transactions = True
     # This feature is specific to the Django fork used for testing.
     supports_tz_offsets = False
+    supports_update_conflicts = True
+    supports_update_conflicts_with_target = True
     supports_virtual_generated_columns = True
-    uses_savepoints = False
     ignores_table_name_case = True
     test_collations = {
         'ci': 'en-ci',
@@ -114,30 +115,6 @@ class DatabaseFeatures(BaseDatabaseFeatures):
         # https://github.com/Snowflake-Labs/django-snowflake/issues/58
         # Query: not analyzed
         'model_fields.test_jsonfield.TestQuerying.test_cast_with_key_text_transform',
-        # Query:
-        #   WHERE "MODEL_FIELDS_NULLABLEJSONMODEL"."VALUE" = 'null'
-        # needs to operate as:
-        #   WHERE "MODEL_FIELDS_NULLABLEJSONMODEL"."VALUE" = PARSE_JSON('null')
-        'model_fields.test_jsonfield.TestSaveLoad.test_json_null_different_from_sql_null',
-        # Query:
-        #   WHERE TO_JSON("MODEL_FIELDS_NULLABLEJSONMODEL"."VALUE":k) = '{"l": "m"}'
-        # needs to operate as:
-        #   WHERE TO_JSON("MODEL_FIELDS_NULLABLEJSONMODEL"."VALUE":k) = PARSE_JSON('{"l": "m"}')
-        'model_fields.test_jsonfield.TestQuerying.test_shallow_lookup_obj_target',
-        # Query:
-        #   WHERE "MODEL_FIELDS_NULLABLEJSONMODEL"."VALUE" = '{"a": "b", "c": 14}'
-        # needs to operate as:
-        #   WHERE "MODEL_FIELDS_NULLABLEJSONMODEL"."VALUE" = PARSE_JSON('{"a": "b", "c": 14}')
-        'model_fields.test_jsonfield.TestQuerying.test_exact_complex',
-        # Three cases:
-        #     lookup='value__bar__in', value=[['foo', 'bar']]
-        #     lookup='value__bar__in', value=[['foo', 'bar'], ['a']]
-        #     lookup='value__bax__in', value=[{'foo': 'bar'}, {'a': 'b'}]
-        # Query:
-        #   WHERE TO_JSON("MODEL_FIELDS_NULLABLEJSONMODEL"."VALUE":bar) IN ('["foo", "bar"]')
-        # needs to operate as:
-        #   WHERE TO_JSON("MODEL_FIELDS_NULLABLEJSONMODEL"."VALUE":bar) IN (PARSE_JSON('["foo", "bar"]'))
-        'model_fields.test_jsonfield.TestQuerying.test_key_in',
         # More unexpected results when querying JSONField.
         'model_fields.test_jsonfield.JSONExactNoneDeprecationTests.test_annotation_q_filter',
         'model_fields.test_jsonfield.JSONExactNoneDeprecationTests.test_case_when',
@@ -153,11 +130,6 @@ class DatabaseFeatures(BaseDatabaseFeatures):
         # for inserting JSON data. In other words, this query doesn't work:
         # SELECT parse_json($1) FROM VALUES (DEFAULT);
         'schema.tests.SchemaTests.test_db_default_output_field_resolving',
-        # QuerySet.bulk_update() not supported for JSONField:
-        # Expression type does not match column data type, expecting VARIANT
-        # but got VARCHAR(16777216) for column JSON_FIELD
-        "model_fields.test_jsonfield.JSONNullTests.test_bulk_update",
-        'queries.test_bulk_update.BulkUpdateTests.test_json_field',
         # Server-side bug?
         # CAST(TO_JSON("MODEL_FIELDS_NULLABLEJSONMODEL"."VALUE":d) AS VARIANT)
         # gives '"[\\"e\\",{\\"f\\":\\"g\\"}]"' and appending [0] gives None.
@@ -429,6 +401,23 @@ class DatabaseFeatures(BaseDatabaseFeatures):
         }
     }
 
+    @cached_property
+    def can_return_columns_from_insert(self):
+        # Primary keys are allocated before inserting if
+        # OPTIONS['pk_sequences'] is set, so returning fields are emulated
+        # (see SQLInsertCompiler.execute_sql_with_returning()).
+        return bool(self.connection.settings_dict['OPTIONS'].get('pk_sequences'))
+
+    @cached_property
+    def can_return_rows_from_bulk_insert(self):
+        return self.can_return_columns_from_insert
+
+    @cached_property
+    def uses_savepoints(self):
+        # Savepoints are emulated if OPTIONS['emulate_savepoints'] is set (see
+        # DatabaseWrapper._savepoint()).
+        return bool(self.connection.settings_dict['OPTIONS'].get('emulate_savepoints'))
+
     @cached_property
     def introspected_field_types(self):
         return {
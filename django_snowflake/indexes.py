@@ -0,0 +1,69 @@
+from django.db.models import Index
+
+
+class SnowflakeIndex(Index):
+    """
+    Base class for the Meta.indexes that the schema editor creates. Snowflake
+    doesn't have conventional indexes, so other Indexes are ignored.
+    """
+
+
+class ClusterBy(SnowflakeIndex):
+    """
+    A table's clustering key:
+    https://docs.snowflake.com/en/user-guide/tables-clustering-keys
+
+    A table can have only one clustering key, so a model can have at most one
+    ClusterBy in Meta.indexes.
+    """
+    suffix = 'cluster'
+
+    def __init__(self, *expressions, fields=(), name=None, **kwargs):
+        if any(field_name.startswith('-') for field_name in fields):
+            raise ValueError('ClusterBy.fields cannot be ordered.')
+        super().__init__(*expressions, fields=fields, name=name, **kwargs)
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        return super().create_sql(model, schema_editor, using=using, sql=schema_editor.sql_create_cluster_by, **kwargs)
+
+    def remove_sql(self, model, schema_editor, **kwargs):
+        return super().remove_sql(model, schema_editor, sql=schema_editor.sql_delete_cluster_by, **kwargs)
+
+
+class SearchOptimization(SnowflakeIndex):
+    """
+    Search optimization for the given fields:
+    https://docs.snowflake.com/en/user-guide/search-optimization-service
+
+    method is the search method, 'EQUALITY' (the default) or 'SUBSTRING'.
+    """
+    suffix = 'search'
+    methods = ('EQUALITY', 'SUBSTRING')
+
+    def __init__(self, *, fields=(), name=None, method='EQUALITY', **kwargs):
+        if method not in self.methods:
+            raise ValueError(
+                'SearchOptimization.method must be one of: %s.' % ', '.join(self.methods)
+            )
+        if any(field_name.startswith('-') for field_name in fields):
+            raise ValueError('SearchOptimization.fields cannot be ordered.')
+        self.method = method
+        super().__init__(fields=fields, name=name, **kwargs)
+
+    def deconstruct(self):
+        path, args, kwargs = super().deconstruct()
+        if self.method != 'EQUALITY':
+            kwargs['method'] = self.method
+        return path, args, kwargs
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        return super().create_sql(
+            model, schema_editor, using=self.method, sql=schema_editor.sql_create_search_optimization, **kwargs
+        )
+
+    def remove_sql(self, model, schema_editor, **kwargs):
+        # Dropping search optimization requires the method and columns
+        # rather than a name.
+        return super().create_sql(
+            model, schema_editor, using=self.method, sql=schema_editor.sql_delete_search_optimization, **kwargs
+        )
@@ -1,18 +1,38 @@
+import weakref
 from collections import namedtuple
 
+from django.db import DatabaseError
 from django.db.backends.base.introspection import (
     BaseDatabaseIntrospection, FieldInfo as BaseFieldInfo,
     TableInfo as BaseTableInfo,
 )
 from django.utils.regex_helper import _lazy_re_compile
 
+from .indexes import ClusterBy
+
 FieldInfo = namedtuple('FieldInfo', BaseFieldInfo._fields + ('pk', 'comment'))
 TableInfo = namedtuple('TableInfo', BaseTableInfo._fields + ('comment',))
+cluster_by_re = _lazy_re_compile(r'^LINEAR\((.*)\)$')
 collation_re = _lazy_re_compile(r"^VARCHAR\(\d+\) COLLATE '([\w+\-]+)'$")
 field_size_re = _lazy_re_compile(r'^[A-Z]+\((\d+)\)')
+identifier_re = _lazy_re_compile(r'^(?:[A-Z_][A-Z0-9_$]*|"[^"]+")$')
 precision_and_scale_re = _lazy_re_compile(r'^NUMBER\((\d+),(\d+)\)$')
 
 
+def get_cluster_by_columns(cluster_by):
+    """
+    Return the column names from a "LINEAR(COL1, COL2)" clustering key, or an
+    empty list if the key includes expressions.
+    """
+    m = cluster_by_re.search(cluster_by)
+    if not m:
+        return []
+    keys = [key.strip() for key in m[1].split(',')]
+    if not all(identifier_re.search(key) for key in keys):
+        return []
+    return [key.strip('"') for key in keys]
+
+
 def get_collation(name):
     """
     Return the collation from a "VARCHAR(11) COLLATE 'collation'" type name.
@@ -41,6 +61,21 @@ def get_precision_and_scale(name):
     return (int(m[1]), int(m[2])) if m else (None, None)
 
 
+def get_described_type(data_type, max_length, precision, scale, collation):
+    """
+    Return the type name that `DESCRIBE TABLE` shows for a column of
+    INFORMATION_SCHEMA.COLUMNS.
+    """
+    if data_type == 'TEXT':
+        name = f'VARCHAR({max_length})'
+        return f"{name} COLLATE '{collation}'" if collation else name
+    if data_type == 'BINARY':
+        return f'BINARY({max_length})'
+    if data_type == 'NUMBER':
+        return f'NUMBER({precision},{scale})'
+    return data_type
+
+
 class DatabaseIntrospection(BaseDatabaseIntrospection):
     # Maps Snowflake data types returned by `DESCRIBE TABLE` to Django Fields.
     data_types_reverse = {
@@ -55,12 +90,125 @@ class DatabaseIntrospection(BaseDatabaseIntrospection):
         'VARIANT': 'JSONField',
     }
 
-    def get_constraints(self, cursor, table_name):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # With OPTIONS['schema_introspection'], the metadata of all tables in
+        # the schema, keyed by (NAME, SCHEMA). See get_schema_metadata().
+        self._schema_metadata = {}
+        # Otherwise, a weak reference to the cursor that fetched
+        # _table_metadata and that metadata. See get_table_metadata().
+        self._table_metadata_cursor = None
+        self._table_metadata = None
+
+    def get_schema_metadata(self, cursor):
+        """
+        Return the properties, keys, and columns of every table in the current
+        schema, fetched with five queries and cached until clear_schema_metadata() is
+        called.
+        """
+        settings_dict = self.connection.settings_dict
+        cache_key = (settings_dict['NAME'], settings_dict['SCHEMA'])
+        if cache_key not in self._schema_metadata:
+            metadata = self._fetch_table_metadata(cursor)
+            # The column of each row of SHOW ... KEYS that has the table name.
+            for kind, table_column in (('IMPORTED', 7), ('PRIMARY', 3), ('UNIQUE', 3)):
+                cursor.execute(f'SHOW {kind} KEYS IN SCHEMA')
+                rows = metadata[kind] = {}
+                for row in cursor.fetchall():
+                    rows.setdefault(row[table_column], []).append(row)
+            primary_key_columns = {
+                (row[3], row[4]) for rows in metadata['PRIMARY'].values() for row in rows
+            }
+            cursor.execute(
+                'SELECT table_name, column_name, data_type, character_maximum_length, '
+                'numeric_precision, numeric_scale, collation_name, is_nullable, '
+                'column_default, is_identity, identity_start, identity_increment, comment '
+                'FROM information_schema.columns WHERE table_schema = CURRENT_SCHEMA() '
+                'ORDER BY table_name, ordinal_position'
+            )
+            columns = metadata['COLUMNS'] = {}
+            for (
+                table, name, data_type, max_length, precision, scale, collation, null,
+                default, identity, identity_start, identity_increment, comment,
+            ) in cursor.fetchall():
+                if identity == 'YES':
+                    default = f'IDENTITY START {identity_start} INCREMENT {identity_increment}'
+                # Rows in the format of `DESCRIBE TABLE`.
+                columns.setdefault(table, []).append((
+                    name,
+                    get_described_type(data_type, max_length, precision, scale, collation),
+                    'COLUMN',
+                    'Y' if null == 'YES' else 'N',
+                    default,
+                    'Y' if (table, name) in primary_key_columns else 'N',
+                    'N', None, None, comment,
+                ))
+            self._schema_metadata[cache_key] = metadata
+        return self._schema_metadata[cache_key]
+
+    def get_table_metadata(self, cursor):
+        """
+        Return the properties of every table in the current schema: the rows of
+        `SHOW TABLES IN SCHEMA` ('TABLES') and the search optimization
+        constraints described so far ('SEARCH_OPTIMIZATION').
+
+        With OPTIONS['schema_introspection'], they're part of
+        get_schema_metadata(). Otherwise, they're only reused by calls with
+        the same cursor (e.g. one run of inspectdb), so that changes made by
+        raw SQL or other sessions are seen by the next introspection.
+        """
+        if self.connection.settings_dict['OPTIONS'].get('schema_introspection'):
+            return self.get_schema_metadata(cursor)
+        if self._table_metadata_cursor is None or self._table_metadata_cursor() is not cursor:
+            self._table_metadata = self._fetch_table_metadata(cursor)
+            self._table_metadata_cursor = weakref.ref(cursor)
+        return self._table_metadata
+
+    def _fetch_table_metadata(self, cursor):
+        cursor.execute('SHOW TABLES IN SCHEMA')
+        return {
+            'TABLES': {row['name']: [row] for row in self._fetch_dicts(cursor)},
+            # {table_name: constraints}. See _get_search_optimization_constraints().
+            'SEARCH_OPTIMIZATION': {},
+        }
+
+    def clear_schema_metadata(self):
+        """
+        Discard the metadata cached by get_schema_metadata() and
+        get_table_metadata().
+        """
+        self._schema_metadata.clear()
+        self._table_metadata_cursor = None
+        self._table_metadata = None
+
+    def _fetch_dicts(self, cursor):
+        """Return the rows of a SHOW query as {column_name: value} dictionaries."""
+        names = [column[0] for column in cursor.description]
+        return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def _get_rows(self, cursor, kind, table_name):
+        """
+        Return the rows of `SHOW {kind} KEYS IN TABLE` or, if kind is
+        'COLUMNS', `DESCRIBE TABLE` for table_name. If kind is 'TABLES',
+        return table_name's row of `SHOW TABLES` as a dictionary.
+        """
         table_name = self.connection.ops.quote_name(table_name)
+        # Strip the quotes to get the name as stored by Snowflake.
+        stored_name = table_name[1:-1]
+        if kind == 'TABLES':
+            return self.get_table_metadata(cursor)['TABLES'].get(stored_name, [])
+        if self.connection.settings_dict['OPTIONS'].get('schema_introspection'):
+            return self.get_schema_metadata(cursor)[kind].get(stored_name, [])
+        if kind == 'COLUMNS':
+            cursor.execute(f'DESCRIBE TABLE {table_name}')
+        else:
+            cursor.execute(f'SHOW {kind} KEYS IN TABLE {table_name}')
+        return cursor.fetchall()
+
+    def get_constraints(self, cursor, table_name):
         constraints = {}
         # Foreign keys
-        cursor.execute(f'SHOW IMPORTED KEYS IN TABLE {table_name}')
-        for row in cursor.fetchall():
+        for row in self._get_rows(cursor, 'IMPORTED', table_name):
             constraints[self.identifier_converter(row[12])] = {
                 'columns': [self.identifier_converter(row[8])],
                 'primary_key': False,
@@ -70,9 +218,8 @@ class DatabaseIntrospection(BaseDatabaseIntrospection):
                 'index': False,
             }
         # Primary keys
-        cursor.execute(f'SHOW PRIMARY KEYS IN TABLE {table_name}')
         # Sort by key_sequence so columns appear in the correct order.
-        pk_rows = sorted(cursor.fetchall(), key=lambda row: row[5])
+        pk_rows = sorted(self._get_rows(cursor, 'PRIMARY', table_name), key=lambda row: row[5])
         if pk_rows:
             columns = [self.identifier_converter(row[4]) for row in pk_rows]
             # Constraint names are all the same. Use the first one.
@@ -86,12 +233,11 @@ class DatabaseIntrospection(BaseDatabaseIntrospection):
                 'index': False,
             }
         # Unique constraints
-        cursor.execute(f'SHOW UNIQUE KEYS IN TABLE {table_name}')
         # The columns of multi-column unique indexes are ordered by row[5].
         # Map {constraint_name: [(row[5], column_name), ...] so the columns can
         # be sorted for each constraint.
         unique_column_orders = {}
-        for row in cursor.fetchall():
+        for row in self._get_rows(cursor, 'UNIQUE', table_name):
             column_name = self.identifier_converter(row[4])
             constraint_name = self.identifier_converter(row[6])
             if constraint_name in constraints:
@@ -112,6 +258,58 @@ class DatabaseIntrospection(BaseDatabaseIntrospection):
         # Order the columns of multi-column unique indexes.
         for constraint_name, orders in unique_column_orders.items():
             constraints[constraint_name]['columns'] = [col for _, col in sorted(orders)]
+        for row in self._get_rows(cursor, 'TABLES', table_name):
+            # Clustering key (see indexes.ClusterBy). Snowflake doesn't name it.
+            if row['cluster_by']:
+                constraints['__cluster_by__'] = {
+                    'columns': [
+                        self.identifier_converter(column)
+                        for column in get_cluster_by_columns(row['cluster_by'])
+                    ],
+                    'primary_key': False,
+                    'unique': False,
+                    'foreign_key': None,
+                    'check': False,
+                    'index': True,
+                    'type': ClusterBy.suffix,
+                }
+            # Search optimization (see indexes.SearchOptimization). The column
+            # is missing on editions that don't support it. Only tables that
+            # have search optimization need a DESCRIBE query.
+            if row.get('search_optimization') == 'ON':
+                constraints.update(self._get_search_optimization_constraints(cursor, row['name']))
+        return constraints
+
+    def _get_search_optimization_constraints(self, cursor, stored_name):
+        """
+        Return the search access paths of `DESCRIBE SEARCH OPTIMIZATION` for
+        the table named stored_name, cached with get_table_metadata().
+        """
+        cached = self.get_table_metadata(cursor)['SEARCH_OPTIMIZATION']
+        if stored_name not in cached:
+            cached[stored_name] = self._describe_search_optimization(cursor, stored_name)
+        return cached[stored_name]
+
+    def _describe_search_optimization(self, cursor, stored_name):
+        try:
+            cursor.execute('DESCRIBE SEARCH OPTIMIZATION ON "%s"' % stored_name)
+        except DatabaseError:
+            # e.g. if the role doesn't have the required privileges.
+            return {}
+        constraints = {}
+        for row in self._fetch_dicts(cursor):
+            # Each method and column is a separate search access path without
+            # a name.
+            target = row['target']
+            constraints['__search_optimization_%s__' % row['expression_id']] = {
+                'columns': [self.identifier_converter(target.strip('"'))] if identifier_re.search(target) else [],
+                'primary_key': False,
+                'unique': False,
+                'foreign_key': None,
+                'check': False,
+                'index': True,
+                'type': row['method'].lower(),
+            }
         return constraints
 
     def get_primary_key_column(self, cursor, table_name):
@@ -123,15 +321,13 @@ class DatabaseIntrospection(BaseDatabaseIntrospection):
         Return a dictionary of {field_name: (field_name_other_table, other_table)}
         representing all foreign keys in the given table.
         """
-        table_name = self.connection.ops.quote_name(table_name)
-        cursor.execute(f'SHOW IMPORTED KEYS IN TABLE {table_name}')
         return {
             self.identifier_converter(row[8]): (
                 self.identifier_converter(row[4]),
                 self.identifier_converter(row[3]),
                 self.on_delete_types["NO ACTION"],
             )
-            for row in cursor.fetchall()
+            for row in self._get_rows(cursor, 'IMPORTED', table_name)
         }
 
     def get_field_type(self, data_type, description):
@@ -147,8 +343,11 @@ class DatabaseIntrospection(BaseDatabaseIntrospection):
                 field_type = 'SmallIntegerField'
             elif description.precision == 10:
                 field_type = 'IntegerField'
-        # Handle AutoField and variants.
-        if description.default and 'IDENTITY' in description.default:
+        # Handle AutoField and variants. With OPTIONS['pk_sequences'], they
+        # default to a sequence's NEXTVAL rather than IDENTITY.
+        if description.default and (
+            'IDENTITY' in description.default or description.default.endswith('.NEXTVAL')
+        ):
             if field_type == 'IntegerField':
                 return 'AutoField'
             elif field_type == 'BigIntegerField':
@@ -158,8 +357,7 @@ class DatabaseIntrospection(BaseDatabaseIntrospection):
         return field_type
 
     def get_table_description(self, cursor, table_name):
-        cursor.execute('DESCRIBE TABLE %s' % self.connection.ops.quote_name(table_name))
-        table_info = cursor.fetchall()
+        table_info = self._get_rows(cursor, 'COLUMNS', table_name)
         return [
             FieldInfo(
                 self.identifier_converter(name),  # name
@@ -1,10 +1,22 @@
+import json
+from functools import lru_cache
+
 from django.db import NotSupportedError
+from django.db.models import JSONField
 from django.db.models.fields.json import (
-    HasKeyLookup, KeyTextTransform, KeyTransform,
+    ContainedBy, DataContains, HasKeyLookup, JSONExact, KeyTextTransform,
+    KeyTransform,
 )
+from django.db.models.lookups import In
 
 
 def compile_json_path(key_transforms):
+    return _compile_json_path(tuple(key_transforms))
+
+
+# Queries usually use the same few paths, so they're compiled once.
+@lru_cache(maxsize=1024)
+def _compile_json_path(key_transforms):
     json_path = ''
     for transform in key_transforms:
         try:
@@ -79,7 +91,141 @@ def key_transform(self, compiler, connection):
     return f'TO_JSON({lhs}{json_path})', tuple(params)
 
 
+def compile_variant(expression, compiler, connection):
+    """
+    Compile a KeyTransform as a VARIANT rather than as JSON text, e.g. so
+    that it can be compared with JSON parameters.
+    """
+    lhs, params, key_transforms = expression.preprocess_lhs(compiler, connection)
+    json_path = compile_json_path(key_transforms)
+    return f'{lhs}{json_path}', tuple(params)
+
+
+def is_variant_transform(expression):
+    return isinstance(expression, KeyTransform) and not isinstance(expression, KeyTextTransform)
+
+
+def process_json_lhs(lookup, compiler, connection):
+    """Compile the left-hand side of a lookup on a JSONField as a VARIANT."""
+    if is_variant_transform(lookup.lhs):
+        return compile_variant(lookup.lhs, compiler, connection)
+    return lookup.process_lhs(compiler, connection)
+
+
+def json_exact(self, compiler, connection):
+    if not self.rhs_is_direct_value():
+        return self.as_sql(compiler, connection)
+    lhs, lhs_params = process_json_lhs(self, compiler, connection)
+    rhs, rhs_params = self.process_rhs(compiler, connection)
+    # Bind the JSON text as a VARIANT since snowflake-connector-python can't
+    # bind VARIANT parameters.
+    return f'{lhs} = PARSE_JSON({rhs})', (*lhs_params, *rhs_params)
+
+
+def json_in(self, compiler, connection):
+    if not (
+        isinstance(self.lhs.output_field, JSONField) and self.rhs_is_direct_value() and
+        not any(hasattr(value, 'resolve_expression') for value in self.rhs)
+    ):
+        return self.as_sql(compiler, connection)
+    lhs, lhs_params = process_json_lhs(self, compiler, connection)
+    # process_rhs() removes None values and raises EmptyResultSet if no
+    # values remain.
+    _, rhs_params = self.process_rhs(compiler, connection)
+    placeholders = ', '.join(['PARSE_JSON(%s)'] * len(rhs_params))
+    return f'{lhs} IN ({placeholders})', (*lhs_params, *rhs_params)
+
+
+def json_contains(lhs, lhs_params, value, depth=0):
+    """
+    Return SQL (and its params) that's true if the VARIANT lhs contains the
+    JSON value, like PostgreSQL's @> operator. Snowflake has no such
+    operator, so the predicate is unrolled from the structure of value.
+    """
+    if isinstance(value, dict):
+        conditions = [(f'IS_OBJECT({lhs})', lhs_params)]
+        for key, item in value.items():
+            conditions.append(json_contains(f'GET({lhs}, %s)', (*lhs_params, key), item, depth))
+    elif isinstance(value, list):
+        conditions = [(f'IS_ARRAY({lhs})', lhs_params)]
+        # Each item must be contained by an element of the array.
+        for item in value:
+            if isinstance(item, (dict, list)):
+                element = f'e{depth}'
+                sql, params = json_contains(element, (), item, depth + 1)
+                conditions.append((
+                    f'ARRAY_SIZE(FILTER(AS_ARRAY({lhs}), {element} -> {sql})) > 0', (*lhs_params, *params),
+                ))
+            else:
+                conditions.append((
+                    f'ARRAY_CONTAINS(PARSE_JSON(%s), AS_ARRAY({lhs}))', (json.dumps(item), *lhs_params),
+                ))
+    else:
+        return f'{lhs} = PARSE_JSON(%s)', (*lhs_params, json.dumps(value))
+    return '(%s)' % ' AND '.join(sql for sql, _ in conditions), tuple(
+        param for _, params in conditions for param in params
+    )
+
+
+def json_contained_by(lhs, lhs_params, value, depth=0):
+    """
+    Return SQL (and its params) that's true if the VARIANT lhs is contained
+    by the JSON value, like PostgreSQL's <@ operator.
+    """
+    if isinstance(value, dict):
+        keys = ', '.join(['%s'] * len(value))
+        conditions = [
+            (f'IS_OBJECT({lhs})', lhs_params),
+            # lhs has no other keys.
+            (f'ARRAY_SIZE(ARRAY_EXCEPT(OBJECT_KEYS({lhs}), ARRAY_CONSTRUCT({keys}))) = 0', (*lhs_params, *value)),
+        ]
+        for key, item in value.items():
+            item_lhs, item_lhs_params = f'GET({lhs}, %s)', (*lhs_params, key)
+            sql, params = json_contained_by(item_lhs, item_lhs_params, item, depth)
+            conditions.append((f'({item_lhs} IS NULL OR {sql})', (*item_lhs_params, *params)))
+    elif isinstance(value, list):
+        # Each element of the array must be contained by an item.
+        element = f'e{depth}'
+        items = []
+        if scalars := [item for item in value if not isinstance(item, (dict, list))]:
+            items.append((f'ARRAY_CONTAINS({element}, AS_ARRAY(PARSE_JSON(%s)))', (json.dumps(scalars),)))
+        for item in value:
+            if isinstance(item, (dict, list)):
+                items.append(json_contained_by(element, (), item, depth + 1))
+        sql = ' OR '.join(sql for sql, _ in items) or 'FALSE'
+        conditions = [
+            (f'IS_ARRAY({lhs})', lhs_params),
+            (
+                f'ARRAY_SIZE(FILTER(AS_ARRAY({lhs}), {element} -> NOT COALESCE({sql}, FALSE))) = 0',
+                (*lhs_params, *(param for _, params in items for param in params)),
+            ),
+        ]
+    else:
+        return f'{lhs} = PARSE_JSON(%s)', (*lhs_params, json.dumps(value))
+    return '(%s)' % ' AND '.join(sql for sql, _ in conditions), tuple(
+        param for _, params in conditions for param in params
+    )
+
+
+def json_containment_lookup(predicate):
+    def as_snowflake(self, compiler, connection):
+        if not self.rhs_is_direct_value():
+            raise NotSupportedError(
+                f'{self.lookup_name} lookup with an expression is not supported on this database backend.'
+            )
+        lhs, lhs_params = process_json_lhs(self, compiler, connection)
+        # Normalize the value as it would be stored (e.g. with the field's
+        # encoder).
+        value = json.loads(connection.ops.adapt_json_value(self.rhs, self.lhs.output_field.encoder))
+        return predicate(lhs, tuple(lhs_params), value)
+    return as_snowflake
+
+
 def register_lookups():
+    ContainedBy.as_snowflake = json_containment_lookup(json_contained_by)
+    DataContains.as_snowflake = json_containment_lookup(json_contains)
     HasKeyLookup.as_snowflake = has_key_lookup
+    In.as_snowflake = json_in
+    JSONExact.as_snowflake = json_exact
     KeyTextTransform.as_snowflake = key_text_transform
     KeyTransform.as_snowflake = key_transform
@@ -0,0 +1,52 @@
+import uuid
+from contextlib import ExitStack
+
+from django.db import connections
+
+
+class QueryTagMiddleware:
+    """
+    Tag the Snowflake queries executed while handling a request (see
+    DatabaseWrapper.query_tag()) with the request's ID and, once the URL is
+    resolved, the name of its view, e.g. to attribute warehouse time in
+    QUERY_HISTORY to endpoints.
+
+    The request ID is taken from the request_id_header (if the request has
+    one) or generated. Since it differs for every request, the session's tag
+    is changed (with ALTER SESSION) before the first query of each request
+    and restored afterward. Set tag_request_id to False to tag queries only
+    with the view name, which changes the tag only when it differs from the
+    previous request's.
+    """
+    request_id_header = 'HTTP_X_REQUEST_ID'
+    tag_request_id = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            with ExitStack() as stack:
+                # Closed (restoring the previous tags) after the response.
+                request._query_tag_stack = stack
+                if self.tag_request_id:
+                    request_id = request.META.get(self.request_id_header) or uuid.uuid4().hex
+                    self.tag_queries(stack, {'request_id': request_id})
+                return self.get_response(request)
+        finally:
+            if self.tag_request_id:
+                # Don't leave the request's tag on the session, e.g. when the
+                # connection is returned to the pool.
+                for connection in self.snowflake_connections():
+                    connection.reset_query_tag()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (stack := getattr(request, '_query_tag_stack', None)) is not None:
+            self.tag_queries(stack, {'view': request.resolver_match.view_name})
+
+    def tag_queries(self, stack, tag):
+        for connection in self.snowflake_connections():
+            stack.enter_context(connection.query_tag(tag))
+
+    def snowflake_connections(self):
+        return [connection for connection in connections.all() if connection.vendor == 'snowflake']
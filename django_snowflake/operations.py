@@ -1,10 +1,15 @@
+import datetime
 import decimal
 import uuid
 
+from django.apps import apps
 from django.conf import settings
+from django.db import transaction
 from django.db.backends.base.operations import BaseDatabaseOperations
 from django.utils import timezone
 
+from .sequences import allocator
+
 
 class DatabaseOperations(BaseDatabaseOperations):
     cast_char_field_without_max_length = 'varchar'
@@ -112,6 +117,41 @@ class DatabaseOperations(BaseDatabaseOperations):
             value = uuid.UUID(value)
         return value
 
+    def convert_datetimefield_values(self, values, expression, connection):
+        tz = timezone.get_current_timezone()
+        return [None if value is None else timezone.make_naive(value, tz) for value in values]
+
+    def convert_durationfield_values(self, values, expression, connection):
+        # See convert_durationfield_value().
+        return [
+            None if value is None else datetime.timedelta(
+                0, 0, float(value) if isinstance(value, decimal.Decimal) else value,
+            )
+            for value in values
+        ]
+
+    def convert_uuidfield_values(self, values, expression, connection):
+        return [None if value is None else uuid.UUID(value) for value in values]
+
+    def get_db_column_converter(self, converter):
+        """
+        Return the method that applies converter (one of the converters from
+        get_db_converters() or convert_durationfield_value()) to a list of a
+        column's values at once, or None if there isn't one.
+        """
+        return {
+            self.convert_datetimefield_value: self.convert_datetimefield_values,
+            self.convert_durationfield_value: self.convert_durationfield_values,
+            self.convert_uuidfield_value: self.convert_uuidfield_values,
+        }.get(converter)
+
+    def quote_string(self, value):
+        """
+        Return value as a string literal for statements that don't accept
+        bind variables (e.g. ALTER SESSION).
+        """
+        return "'%s'" % value.replace('\\', '\\\\').replace("'", "\\'")
+
     def explain_query_prefix(self, format=None, **options):
         if format is None:
             format = 'TABULAR'
@@ -122,7 +162,9 @@ class DatabaseOperations(BaseDatabaseOperations):
         return cursor.query or super().last_executed_query(cursor, sql, params)
 
     def last_insert_id(self, cursor, table_name, pk_name):
-        # This is subject to race conditions.
+        # This is subject to race conditions. It isn't used if
+        # OPTIONS['pk_sequences'] is set since primary keys are then
+        # allocated before inserting.
         return cursor.execute(
             'SELECT MAX({pk_name}) FROM {table_name}'.format(
                 pk_name=self.quote_name(pk_name),
@@ -142,6 +184,25 @@ class DatabaseOperations(BaseDatabaseOperations):
     def no_limit_value(self):
         return 'null'
 
+    def _pk_sequence_tables(self, tables):
+        """Return the tables whose AutoField values are allocated from a sequence."""
+        if not self.connection.settings_dict['OPTIONS'].get('pk_sequences'):
+            return []
+        auto_field_tables = {
+            model._meta.db_table for model in apps.get_models(include_auto_created=True)
+            if model._meta.auto_field
+        }
+        return [table_name for table_name in tables if table_name in auto_field_tables]
+
+    def pk_sequence_name(self, table_name):
+        """
+        Return the quoted name of the sequence that backs table_name's
+        AutoField if OPTIONS['pk_sequences'] is set.
+        """
+        if table_name.startswith('"') and table_name.endswith('"'):
+            return '"%s_SEQ"' % table_name[1:-1]
+        return self.quote_name('%s_seq' % table_name)
+
     def quote_name(self, name):
         if name.startswith('"') and name.endswith('"'):
             return name  # Quoting once is enough.
@@ -151,6 +212,18 @@ class DatabaseOperations(BaseDatabaseOperations):
         match_option = 'c' if lookup_type == 'regex' else 'i'
         return f"REGEXP_INSTR(%s, %s, 1, 1, 0, '{match_option}') > 0"
 
+    def sequence_values_sql(self, sequence_name, count):
+        """Return the SQL to fetch count values from the given sequence."""
+        return 'SELECT %s.NEXTVAL FROM TABLE(GENERATOR(ROWCOUNT => %d))' % (sequence_name, count)
+
+    def execute_sql_flush(self, sql_list):
+        """Execute the statements from sql_flush() in multi-statement requests."""
+        with transaction.atomic(using=self.connection.alias, savepoint=self.connection.features.can_rollback_ddl):
+            self.connection.execute_batch(sql_list)
+        self.connection.clear_result_cache()
+        # Unused values of sequences that were reset can't be used.
+        allocator.clear()
+
     def sql_flush(self, style, tables, *, reset_sequences=False, allow_cascade=False):
         if not tables:
             return []
@@ -162,6 +235,14 @@ class DatabaseOperations(BaseDatabaseOperations):
                     style.SQL_FIELD(self.quote_name(table_name)),
                 ) for table_name in tables
             )
+            # Recreate the sequences of OPTIONS['pk_sequences'] since
+            # Snowflake can't restart a sequence.
+            sql.extend(
+                '%s %s;' % (
+                    style.SQL_KEYWORD('CREATE OR REPLACE SEQUENCE'),
+                    style.SQL_FIELD(self.pk_sequence_name(table_name)),
+                ) for table_name in self._pk_sequence_tables(tables)
+            )
         else:
             # DELETE to preserve sequences.
             sql.extend(
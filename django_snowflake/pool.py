@@ -0,0 +1,153 @@
+import threading
+import time
+from collections import deque
+
+from snowflake.connector.errors import OperationalError
+
+
+class PoolTimeout(OperationalError):
+    """No connection became available before the pool's timeout."""
+
+
+class PooledConnection:
+    """An idle connection and the times it was opened and last used."""
+
+    def __init__(self, connection, created_at):
+        self.connection = connection
+        self.created_at = created_at
+        self.last_used = time.monotonic()
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of snowflake.connector connections, configured with
+    DATABASES[...]['OPTIONS']['pool'].
+
+    - min_size: the number of idle connections that are kept even if they
+      exceed max_idle.
+    - max_size: the maximum number of connections (in use and idle). None
+      means unlimited.
+    - max_idle: the number of seconds after which an idle connection is
+      closed.
+    - max_lifetime: the number of seconds after which a connection is closed
+      rather than returned to the pool.
+    - timeout: the number of seconds getconn() waits for a connection when
+      max_size connections are in use.
+
+    The pool also keeps the state of each connection's session (e.g. session
+    parameters set by DatabaseWrapper.init_connection_state()) so that it
+    needn't be initialized again when the connection is reused.
+    """
+
+    def __init__(self, connect, min_size=0, max_size=None, max_idle=600, max_lifetime=3600,
+                 timeout=30, check=None):
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        # A function that returns True if an idle connection is usable.
+        self.check = check
+        self._condition = threading.Condition()
+        self._idle = deque()
+        self._created_at = {}
+        self._session_states = {}
+        self._size = 0
+        self._closed = False
+
+    def getconn(self, conn_params):
+        """
+        Return an idle connection or, if there aren't any, a new one opened
+        with conn_params.
+        """
+        deadline = time.monotonic() + self.timeout
+        with self._condition:
+            while True:
+                self._evict()
+                if self._idle:
+                    pooled = self._idle.pop()
+                    break
+                if self.max_size is None or self._size < self.max_size:
+                    # Reserve a slot and open the connection without holding
+                    # the lock.
+                    self._size += 1
+                    pooled = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._condition.wait(remaining):
+                    raise PoolTimeout(
+                        msg="Couldn't get a connection from the pool within %s seconds." % self.timeout
+                    )
+        if pooled is not None:
+            if pooled.connection.is_closed() or (self.check and not self.check(pooled.connection)):
+                self._discard(pooled.connection)
+                return self.getconn(conn_params)
+            return pooled.connection
+        try:
+            connection = self.connect(**conn_params)
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._created_at[id(connection)] = time.monotonic()
+        return connection
+
+    def putconn(self, connection):
+        """Return a connection from getconn() to the pool."""
+        with self._condition:
+            created_at = self._created_at.get(id(connection), 0)
+            expired = time.monotonic() - created_at > self.max_lifetime
+            if self._closed or expired or connection.is_closed():
+                reuse = False
+            else:
+                self._idle.append(PooledConnection(connection, created_at))
+                self._condition.notify()
+                reuse = True
+        if not reuse:
+            self._discard(connection)
+
+    def session_state(self, connection):
+        """
+        Return a dictionary describing the session state of a connection from
+        getconn(). It's kept while the connection is in the pool.
+        """
+        with self._condition:
+            return self._session_states.setdefault(id(connection), {})
+
+    def close(self):
+        """Close the idle connections. In-use connections are closed when returned."""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, deque()
+        for pooled in idle:
+            self._discard(pooled.connection)
+
+    def _evict(self):
+        """Close connections that were idle too long. Called with the lock held."""
+        now = time.monotonic()
+        keep = deque()
+        for pooled in self._idle:
+            idle_too_long = now - pooled.last_used > self.max_idle and len(keep) >= self.min_size
+            if idle_too_long or now - pooled.created_at > self.max_lifetime:
+                # Close it in the background rather than while holding the lock.
+                threading.Thread(target=self._discard, args=(pooled.connection, False), daemon=True).start()
+                self._size -= 1
+            else:
+                keep.append(pooled)
+        self._idle = keep
+
+    def _discard(self, connection, release=True):
+        if release:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+        with self._condition:
+            self._created_at.pop(id(connection), None)
+            self._session_states.pop(id(connection), None)
+        try:
+            connection.close()
+        except Exception:
+            pass
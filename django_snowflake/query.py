@@ -0,0 +1,21 @@
+from django.db.models import QuerySet
+
+
+class WarehouseQuerySet(QuerySet):
+    """
+    A QuerySet whose queries can be executed with a different warehouse than
+    settings.DATABASES[...]['WAREHOUSE'], e.g. to run heavy reports on a
+    larger warehouse:
+
+        class Report(models.Model):
+            objects = WarehouseQuerySet.as_manager()
+
+        Report.objects.using_warehouse('XL_WH').filter(...)
+    """
+
+    def using_warehouse(self, warehouse):
+        """Execute this QuerySet's queries with the given warehouse."""
+        clone = self._chain()
+        # See SQLCompiler.execute_sql().
+        clone.query.warehouse = warehouse
+        return clone
@@ -1,29 +1,117 @@
 from django.db import NotSupportedError
-from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+from django.db.backends.base.schema import BaseDatabaseSchemaEditor, logger
 from django.db.models import NOT_PROVIDED
 
+from .indexes import SnowflakeIndex
+
 
 class DatabaseSchemaEditor(BaseDatabaseSchemaEditor):
+    auto_field_types = {'AutoField', 'BigAutoField', 'SmallAutoField'}
+    sql_create_cluster_by = 'ALTER TABLE %(table)s CLUSTER BY (%(columns)s)'
     sql_create_column_inline_fk = (
         'CONSTRAINT %(name)s FOREIGN KEY REFERENCES %(to_table)s(%(to_column)s)'
     )
+    sql_create_search_optimization = 'ALTER TABLE %(table)s ADD SEARCH OPTIMIZATION ON %(using)s(%(columns)s)'
+    sql_create_sequence = 'CREATE SEQUENCE IF NOT EXISTS %(sequence)s'
+    sql_create_sequence_start = 'CREATE SEQUENCE IF NOT EXISTS %(sequence)s START = %(start)s'
+    sql_delete_cluster_by = 'ALTER TABLE %(table)s DROP CLUSTERING KEY'
     sql_delete_procedure = 'DROP PROCEDURE %(procedure)s(%(param_types)s)'
+    sql_delete_search_optimization = 'ALTER TABLE %(table)s DROP SEARCH OPTIMIZATION ON %(using)s(%(columns)s)'
+    sql_delete_sequence = 'DROP SEQUENCE IF EXISTS %(sequence)s'
+    sql_rename_sequence = 'ALTER SEQUENCE IF EXISTS %(old_sequence)s RENAME TO %(new_sequence)s'
+
+    def _uses_pk_sequence(self, field):
+        """
+        Return True if field's values are allocated from a sequence (see
+        OPTIONS['pk_sequences']).
+        """
+        return (
+            bool(self.connection.settings_dict['OPTIONS'].get('pk_sequences'))
+            and field.get_internal_type() in self.auto_field_types
+        )
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            # Execute the deferred statements (e.g. foreign keys and unique
+            # constraints) in batches.
+            deferred_sql, self.deferred_sql = self.deferred_sql, []
+            self.execute_batch(deferred_sql)
+        super().__exit__(exc_type, exc_value, traceback)
 
-    def _create_index_sql(self, model, fields=None, **kwargs):
-        # Snowflake doesn't use indexes.
-        return ''
+    def execute_batch(self, sql_list):
+        """
+        Execute statements without parameters like execute(), but in
+        multi-statement requests (see DatabaseWrapper.execute_batch()).
+        """
+        if self.collect_sql or self.connection.in_atomic_block or len(sql_list) < 2:
+            for sql in sql_list:
+                self.execute(sql, None)
+            return
+        sql_list = [str(sql) for sql in sql_list]
+        for sql in sql_list:
+            logger.debug('%s; (params %r)', sql, None, extra={'params': None, 'sql': sql})
+        self.connection.introspection.clear_schema_metadata()
+        self.connection.clear_result_cache()
+        self.connection.execute_batch(sql_list)
+
+    def execute(self, sql, params=()):
+        # Discard the metadata cached by OPTIONS['schema_introspection'] and
+        # the results cached by OPTIONS['result_cache'].
+        self.connection.introspection.clear_schema_metadata()
+        self.connection.clear_result_cache()
+        super().execute(sql, params)
+
+    def create_model(self, model):
+        if model._meta.auto_field and self._uses_pk_sequence(model._meta.auto_field):
+            # The sequence must exist before the column that defaults to it.
+            self.execute(self.sql_create_sequence % {
+                'sequence': self.connection.ops.pk_sequence_name(model._meta.db_table),
+            })
+        super().create_model(model)
+
+    def delete_model(self, model):
+        super().delete_model(model)
+        if model._meta.auto_field and self._uses_pk_sequence(model._meta.auto_field):
+            self.execute(self.sql_delete_sequence % {
+                'sequence': self.connection.ops.pk_sequence_name(model._meta.db_table),
+            })
+
+    def alter_db_table(self, model, old_db_table, new_db_table):
+        super().alter_db_table(model, old_db_table, new_db_table)
+        if (
+            old_db_table != new_db_table and model._meta.auto_field and
+            self._uses_pk_sequence(model._meta.auto_field)
+        ):
+            self.execute(self.sql_rename_sequence % {
+                'old_sequence': self.connection.ops.pk_sequence_name(old_db_table),
+                'new_sequence': self.connection.ops.pk_sequence_name(new_db_table),
+            })
+
+    def _create_index_sql(self, model, *, sql=None, **kwargs):
+        # Snowflake doesn't use indexes. SnowflakeIndexes provide their own
+        # SQL.
+        if sql is None:
+            return ''
+        return super()._create_index_sql(model, sql=sql, **kwargs)
 
     def _model_indexes_sql(self, model):
-        return []
+        if not model._meta.managed or model._meta.proxy or model._meta.swapped:
+            return []
+        return [
+            index.create_sql(model, self)
+            for index in model._meta.indexes if isinstance(index, SnowflakeIndex)
+        ]
 
     def _field_indexes_sql(self, model, field):
         return []
 
     def add_index(self, model, index):
-        pass
+        if isinstance(index, SnowflakeIndex):
+            self.execute(index.create_sql(model, self), params=None)
 
     def remove_index(self, model, index):
-        pass
+        if isinstance(index, SnowflakeIndex):
+            self.execute(index.remove_sql(model, self))
 
     def alter_index_together(self, model, old_index_together, new_index_together):
         pass
@@ -32,6 +120,11 @@ class DatabaseSchemaEditor(BaseDatabaseSchemaEditor):
         # Special-case implicit M2M tables
         if field.many_to_many and field.remote_field.through._meta.auto_created:
             return self.create_model(field.remote_field.through)
+        if self._uses_pk_sequence(field):
+            # The sequence must exist before the column that defaults to it.
+            self.execute(self.sql_create_sequence % {
+                'sequence': self.connection.ops.pk_sequence_name(model._meta.db_table),
+            })
         # Get the column's definition
         definition, params = self.column_sql(model, field, exclude_not_null=True)
         # It might not actually have a column behind it
@@ -104,6 +197,9 @@ class DatabaseSchemaEditor(BaseDatabaseSchemaEditor):
             default_sql, default_params = self.db_default_sql(field)
             sql += f" DEFAULT {default_sql}"
             params.extend(default_params)
+        elif self._uses_pk_sequence(field):
+            sequence_name = self.connection.ops.pk_sequence_name(model._meta.db_table)
+            sql += f" DEFAULT {sequence_name}.NEXTVAL"
         if field.primary_key:
             sql += " PRIMARY KEY"
         if field.unique:
@@ -138,7 +234,7 @@ class DatabaseSchemaEditor(BaseDatabaseSchemaEditor):
             model, old_field, new_field, old_type, new_type,
             old_db_params, new_db_params, strict,
         )
-        auto_fields = self.connection.data_types_suffix
+        auto_fields = self.auto_field_types
         old_internal_type = old_field.get_internal_type()
         new_internal_type = new_field.get_internal_type()
         # Altering to an AutoField isn't supported because Snowflake doesn't
@@ -151,7 +247,8 @@ class DatabaseSchemaEditor(BaseDatabaseSchemaEditor):
                     'field_type': new_internal_type,
                 }
             )
-        # If migrating away from AutoField, drop AUTOINCREMENT.
+        # If migrating away from AutoField, drop AUTOINCREMENT (or the
+        # sequence default).
         if old_internal_type in auto_fields and new_internal_type not in auto_fields:
             self.execute(self.sql_alter_column % {
                 "table": self.quote_name(model._meta.db_table),
@@ -0,0 +1,87 @@
+import threading
+from collections import deque
+
+from django.db import DatabaseError
+
+
+class IDAllocator:
+    """
+    Allocate primary key values from the sequences that back AutoFields when
+    DATABASES[...]['OPTIONS']['pk_sequences'] is set.
+
+    Values are fetched from Snowflake in blocks and the unused ones are kept
+    (per process) for later inserts, so most inserts don't need a query to
+    get their primary key. Sequence values are unique across all sessions,
+    so concurrent inserts can't get the same value.
+    """
+    default_block_size = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pools = {}
+
+    def get_block_size(self, connection):
+        options = connection.settings_dict['OPTIONS'].get('pk_sequences')
+        if isinstance(options, dict):
+            return options.get('block_size', self.default_block_size)
+        return self.default_block_size
+
+    def allocate(self, connection, table_name, pk_column, count):
+        """Return a list of count unused values for table_name's primary key."""
+        sequence_name = connection.ops.pk_sequence_name(table_name)
+        settings_dict = connection.settings_dict
+        key = (settings_dict['ACCOUNT'], settings_dict['NAME'], settings_dict['SCHEMA'], sequence_name)
+        with self._lock:
+            pool = self._pools.setdefault(key, deque())
+            values = [pool.popleft() for _ in range(min(count, len(pool)))]
+        missing = count - len(values)
+        if missing:
+            # Don't hold the lock while querying. If multiple threads fetch
+            # a block at the same time, all of the values are still unique.
+            fetched = self.fetch(
+                connection, sequence_name, table_name, pk_column, max(missing, self.get_block_size(connection)),
+            )
+            values.extend(fetched[:missing])
+            with self._lock:
+                pool.extend(fetched[missing:])
+        return values
+
+    def fetch(self, connection, sequence_name, table_name, pk_column, count):
+        sql = connection.ops.sequence_values_sql(sequence_name, count)
+        with connection.cursor() as cursor:
+            try:
+                cursor.execute(sql)
+            except DatabaseError as exc:
+                if 'does not exist' not in str(exc):
+                    raise
+                # The table was created before OPTIONS['pk_sequences'] was
+                # enabled.
+                self.create_sequence(connection, sequence_name, table_name, pk_column)
+                cursor.execute(sql)
+            return [row[0] for row in cursor.fetchall()]
+
+    def create_sequence(self, connection, sequence_name, table_name, pk_column):
+        """
+        Create the sequence for a table that doesn't have one, starting after
+        the table's largest primary key.
+        """
+        quote_name = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT MAX(%s) FROM %s' % (quote_name(pk_column), quote_name(table_name)))
+            start = (cursor.fetchone()[0] or 0) + 1
+        # DDL commits the current transaction, so the sequence is created
+        # with another connection.
+        other = connection.copy()
+        try:
+            with other.schema_editor() as editor:
+                editor.execute(editor.sql_create_sequence_start % {'sequence': sequence_name, 'start': start})
+        finally:
+            other.close()
+
+    def clear(self):
+        """Discard all unused values."""
+        with self._lock:
+            self._pools.clear()
+
+
+allocator = IDAllocator()
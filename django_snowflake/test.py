@@ -0,0 +1,45 @@
+from django.core.management import call_command
+from django.db import connections
+from django.test import TransactionTestCase
+
+
+class SnapshotTestCase(TransactionTestCase):
+    """
+    A TransactionTestCase that loads its fixtures once per class and, after
+    each test, restores the test schema from a zero-copy clone rather than
+    deleting the rows of every table and reloading the fixtures.
+
+    All of the test case's databases must use django_snowflake.
+    serialized_rollback and reset_sequences aren't supported.
+    """
+    _snapshots_taken = False
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls._snapshots_taken:
+            for db_name in cls._databases_names(include_mirrors=False):
+                creation = connections[db_name].creation
+                creation.restore_schema('INITIAL')
+                creation.drop_schema_snapshot('INITIAL')
+                creation.drop_schema_snapshot('FIXTURES')
+            cls._snapshots_taken = False
+        super().tearDownClass()
+
+    @classmethod
+    def _fixture_setup(cls):
+        if cls._snapshots_taken:
+            # The fixtures were restored by _fixture_teardown().
+            return
+        for db_name in cls._databases_names(include_mirrors=False):
+            creation = connections[db_name].creation
+            # Restored after the last test so that the fixtures don't leak
+            # into later test cases.
+            creation.snapshot_schema('INITIAL')
+            if cls.fixtures:
+                call_command('loaddata', *cls.fixtures, verbosity=0, database=db_name)
+            creation.snapshot_schema('FIXTURES')
+        cls._snapshots_taken = True
+
+    def _fixture_teardown(self):
+        for db_name in self._databases_names(include_mirrors=False):
+            connections[db_name].creation.restore_schema('FIXTURES')